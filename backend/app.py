@@ -2,14 +2,26 @@
 Kashmir Tourism Footfall Prediction API
 Flask backend that serves ML model predictions
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import joblib
 import numpy as np
-import pandas as pd
+from dataclasses import replace
 from datetime import datetime
+import hashlib
 import os
 import logging
+import threading
+import time
+
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
+from tree_engine import export_model
+from micro_batching import MicroBatcher, QueueFullError
+from metrics import Metrics
+from shadow import ShadowScorer
+from audit_log import AuditLog
+from weather_store import WEATHER_COLUMNS as WEATHER_STORE_COLUMNS, DEFAULT_STORE_PATH, WeatherStore
+from serialization import JSON_BACKEND, dumps, json_response, splice
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,37 +30,79 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
-# Initialize model variables
-model = None
-scaler = None
-metadata = None
+# Per-stage latency histograms and request counters, exposed at /api/metrics
+metrics = Metrics()
+metrics.describe('stage_latency_seconds', 'histogram', 'Latency of prediction pipeline stages by path (model or fallback)')
+metrics.describe('request_latency_seconds', 'histogram', 'End-to-end request latency by endpoint')
+metrics.describe('requests_total', 'counter', 'HTTP requests by endpoint, method, status and prediction path')
+metrics.describe('errors_total', 'counter', 'HTTP 5xx responses by endpoint')
+metrics.describe('prediction_cache_lookups_total', 'counter', 'Prediction cache lookups by result (hit or miss)')
+metrics.describe('conditional_requests_total', 'counter', 'GET /api/predict requests by result (not_modified or full)')
+metrics.describe('forecast_streams_total', 'counter', 'Streamed forecasts by outcome (completed, cancelled or error)')
+metrics.describe('model_loaded', 'gauge', '1 if a model bundle is loaded, else 0')
+metrics.describe('prediction_cache_size', 'gauge', 'Entries in the prediction cache')
+metrics.describe('prediction_cache_hit_ratio', 'gauge', 'Prediction cache hits / lookups since startup')
+metrics.describe('prediction_cache_evictions', 'gauge', 'Prediction cache LRU evictions since startup')
+metrics.describe('micro_batch_batches', 'gauge', 'Micro-batches run since startup')
+metrics.describe('micro_batch_requests', 'gauge', 'Requests served through micro-batching since startup')
+metrics.describe('micro_batch_rejected', 'gauge', 'Requests rejected because the micro-batching queue was full')
+metrics.describe('micro_batch_queue_size', 'gauge', 'Requests waiting in the micro-batching queue')
+metrics.describe('audit_log_queue_size', 'gauge', 'Prediction audit records waiting to be written')
+metrics.describe('audit_log_dropped', 'gauge', 'Prediction audit records dropped because the queue was full')
+metrics.describe('audit_log_written', 'gauge', 'Prediction audit records written since startup')
 
 # Load trained model and scaler
 MODEL_PATH = os.path.join('models', 'best_model', 'model.pkl')
 SCALER_PATH = os.path.join('models', 'scaler.pkl')
 METADATA_PATH = os.path.join('models', 'best_model', 'metadata.pkl')
 
-def load_model():
-    """Load model, scaler, and metadata with proper error handling"""
-    global model, scaler, metadata
-    try:
-        model = joblib.load(MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
-        metadata = joblib.load(METADATA_PATH)
-        logger.info("✓ Model loaded successfully")
-        logger.info(f"  Model type: {metadata.get('model_type', 'unknown')}")
-        logger.info(f"  Features: {model.n_features_in_}")
-        logger.info(f"  Target transform: {metadata.get('target_transform', 'linear')}")
-        return True
-    except Exception as e:
-        logger.error(f"✗ Failed to load model: {str(e)}")
-        model = None
-        scaler = None
-        metadata = None
-        return False
+# Optional candidate model (e.g. a retrained one) scored alongside the primary on live traffic.
+# Its scaler defaults to the primary's and its metadata to metadata.pkl next to the model.
+CANDIDATE_MODEL_PATH = os.environ.get('CANDIDATE_MODEL_PATH') or None
+CANDIDATE_SCALER_PATH = os.environ.get('CANDIDATE_SCALER_PATH', SCALER_PATH)
+CANDIDATE_METADATA_PATH = os.environ.get('CANDIDATE_METADATA_PATH') or (
+    os.path.join(os.path.dirname(CANDIDATE_MODEL_PATH), 'metadata.pkl') if CANDIDATE_MODEL_PATH else None)
+
+# Share of single predictions served by the candidate (A/B test); the other model is shadow-scored
+CANDIDATE_TRAFFIC_PERCENT = float(os.environ.get('CANDIDATE_TRAFFIC_PERCENT', '0'))
+SHADOW_WORKERS = int(os.environ.get('SHADOW_WORKERS', '1'))
+SHADOW_MAX_PENDING = int(os.environ.get('SHADOW_MAX_PENDING', '256'))
+SHADOW_LOG_PATH = os.environ.get('SHADOW_LOG_PATH', os.path.join('logs', 'shadow_predictions.jsonl'))
+
+# Structured prediction audit log, written off the request thread ({pid}: one file per worker process)
+AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', os.path.join('logs', 'predictions-{pid}.jsonl'))
+AUDIT_LOG_SAMPLE_RATE = float(os.environ.get('AUDIT_LOG_SAMPLE_RATE', '1'))  # 0 disables
+audit_log = AuditLog(
+    AUDIT_LOG_PATH,
+    sample_rate=AUDIT_LOG_SAMPLE_RATE,
+    max_queue=int(os.environ.get('AUDIT_LOG_QUEUE_SIZE', '10000')),
+    max_bytes=int(os.environ.get('AUDIT_LOG_MAX_BYTES', str(50 * 1024 * 1024))),
+    backups=int(os.environ.get('AUDIT_LOG_BACKUPS', '5'))
+)
 
-# Load model on startup
-load_model()
+# Year-specific weather built by `python backend/weather_store.py ingest` (climatology where it has no data)
+WEATHER_STORE_PATH = os.environ.get('WEATHER_STORE_PATH', DEFAULT_STORE_PATH)
+
+# Seconds between checks of the model artifacts for changes (0 disables hot reload)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '5'))
+
+# joblib mmap_mode for the model and scaler arrays (e.g. 'r'); set by gunicorn.conf.py in production
+MODEL_MMAP_MODE = os.environ.get('MODEL_MMAP_MODE') or None
+
+# Inference backend: 'sklearn' calls model.predict, 'flat' uses the array-backed tree engine
+# for batches of up to TREE_ENGINE_MAX_ROWS rows (larger batches still use model.predict)
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'sklearn')
+TREE_ENGINE_MAX_ROWS = int(os.environ.get('TREE_ENGINE_MAX_ROWS', '512'))
+TREE_ENGINE_TOLERANCE = 1e-6
+
+# Override n_jobs of the loaded model (e.g. 1 when running several workers); unset keeps the pickled value
+MODEL_N_JOBS = os.environ.get('MODEL_N_JOBS')
+
+# Full location x month passes through the model path before a new bundle goes live (0 disables)
+MODEL_WARMUP_PASSES = int(os.environ.get('MODEL_WARMUP_PASSES', '3'))
+
+# Predictions across locations for the same month closer than this are suspicious
+SANITY_MIN_LOCATION_RANGE = 1000
 
 # Location encoding (from your feature_engineering.py)
 LOCATION_MAPPING = {
@@ -245,10 +299,11 @@ def get_season(month):
     else:
         return 4  # Autumn
 
-def prepare_features(location, year, month, rolling_avg=80000):
+def build_feature_row(location, year, month, rolling_avg=80000):
     """
-    Prepare 17 features for model prediction
+    Build the 17 features for one location/month from WEATHER_DATA and HOLIDAY_DATA
     Matches the features expected by the trained XGBoost model
+    Used at startup to compile FEATURE_TABLE - request paths gather from the table
     """
     location_code = LOCATION_MAPPING.get(location, 3)  # Default to Gulmarg
     season = get_season(month)
@@ -292,676 +347,2305 @@ def prepare_features(location, year, month, rolling_avg=80000):
         # Note: Removed days_to_next_holiday and snowfall_sum to match model expectations
     ]
 
-    return np.array(features).reshape(1, -1)
+    return features
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    # Try to load model if not loaded
-    if model is None:
-        load_model()
-    
-    return jsonify({
-        'status': 'healthy',
-        'model_loaded': model is not None,
-        'timestamp': datetime.now().isoformat()
-    })
+# Feature columns that change per request; every other column depends only on (location, month)
+YEAR_COLUMN = 1
+ROLLING_AVG_COLUMN = 4
+DYNAMIC_COLUMNS = [YEAR_COLUMN, ROLLING_AVG_COLUMN]
+NUM_FEATURES = 17
+FEATURE_NAMES = [
+    'location_encoded', 'year', 'month', 'season', 'footfall_rolling_avg',
+    'temperature_2m_mean', 'temperature_2m_max', 'temperature_2m_min', 'precipitation_sum',
+    'sunshine_duration', 'temp_sunshine_interaction', 'temperature_range', 'precipitation_temperature',
+    'holiday_count', 'long_weekend_count', 'national_holiday_count', 'festival_holiday_count'
+]
 
-@app.route('/api/predict', methods=['POST'])
-def predict():
+def compile_feature_table():
     """
-    Predict footfall for given location and date with detailed insights
-
-    Expected JSON:
-    {
-        "location": "Gulmarg",
-        "year": 2024,
-        "month": 12,
-        "rolling_avg": 95000  (optional)
-    }
+    Compile WEATHER_DATA/HOLIDAY_DATA (and the derived interaction terms) into a dense
+    [location_code, month, feature] array. Year and rolling_avg columns are left at zero.
     """
+    table = np.zeros((max(LOCATION_MAPPING.values()) + 1, 13, NUM_FEATURES))
+    for location, location_code in LOCATION_MAPPING.items():
+        for month in range(1, 13):
+            table[location_code, month] = build_feature_row(location, 0, month, 0)
+    table.setflags(write=False)
+    return table
+
+FEATURE_TABLE = compile_feature_table()
+
+def location_codes_for(locations):
+    """Map location names to codes (unknown locations default to Gulmarg)"""
+    return np.array([LOCATION_MAPPING.get(location, 3) for location in locations], dtype=np.intp)
+
+def apply_interaction_features(features):
+    """Recompute the derived interaction columns of an N x 17 feature matrix in place"""
+    column = FEATURE_NAMES.index
+    temp_mean = features[:, column('temperature_2m_mean')]
+    features[:, column('temp_sunshine_interaction')] = temp_mean * features[:, column('sunshine_duration')]
+    features[:, column('temperature_range')] = (features[:, column('temperature_2m_max')]
+                                                - features[:, column('temperature_2m_min')])
+    features[:, column('precipitation_temperature')] = features[:, column('precipitation_sum')] * temp_mean
+
+# Weather columns the weather store can override, plus the interaction terms derived from them
+WEATHER_FEATURE_COLUMNS = [FEATURE_NAMES.index(name) for name in WEATHER_STORE_COLUMNS]
+INTERACTION_COLUMNS = [FEATURE_NAMES.index(name)
+                       for name in ('temp_sunshine_interaction', 'temperature_range', 'precipitation_temperature')]
+STORED_WEATHER_COLUMNS = WEATHER_FEATURE_COLUMNS + INTERACTION_COLUMNS
+
+def open_weather_store(path):
+    """Memory-map the weather store at path, or None (climatology only) if there is none or it is unusable"""
+    if not os.path.exists(os.path.join(path, 'meta.json')):
+        return None
     try:
-        data = request.get_json()
+        store = WeatherStore.open(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Weather store at {path} is unusable, using climatology: {str(e)}")
+        return None
+    logger.info(f"✓ Weather store {store.version} mapped: {len(store.locations)} locations, "
+                f"{store.year_min}-{store.year_max}")
+    return store
 
-        # Validate inputs
-        location = data.get('location')
-        year = data.get('year')
-        month = data.get('month')
-        rolling_avg = data.get('rolling_avg', 80000)
+weather_store = open_weather_store(WEATHER_STORE_PATH)
 
-        if not all([location, year, month]):
-            return jsonify({'error': 'Missing required fields: location, year, month'}), 400
+# Weather store row of each location code (-1: no stored weather for that location)
+WEATHER_STORE_ROWS = np.full(len(FEATURE_TABLE), -1, dtype=np.intp)
+if weather_store is not None:
+    WEATHER_STORE_ROWS[list(LOCATION_MAPPING.values())] = weather_store.rows_for(LOCATION_MAPPING)
 
-        if location not in LOCATION_MAPPING:
-            return jsonify({'error': f'Unknown location: {location}'}), 400
+def stored_weather(location_codes, years, months):
+    """N x 5 year-specific weather (WEATHER_STORE_COLUMNS order) from the weather store; NaN where it has none"""
+    if weather_store is None:
+        return np.full((len(location_codes), len(WEATHER_STORE_COLUMNS)), np.nan)
+    return weather_store.lookup(WEATHER_STORE_ROWS[location_codes], years, months)
 
-        if not (1 <= month <= 12):
-            return jsonify({'error': 'Month must be between 1 and 12'}), 400
+def apply_stored_weather(features, location_codes, years, months, scaling=None):
+    """
+    Replace the climatology weather of an N x 17 feature matrix, in place, with the weather
+    store's values for those years, recomputing the interaction terms of the affected rows.
+    Values the store lacks keep climatology. scaling=(mean, scale) for pre-scaled matrices.
+    """
+    if weather_store is None:
+        return
+    stored = stored_weather(location_codes, years, months)
+    rows = np.flatnonzero(~np.isnan(stored).all(axis=1))
+    if not len(rows):
+        return
+    raw = FEATURE_TABLE[location_codes[rows], months[rows]]
+    stored = stored[rows]
+    raw[:, WEATHER_FEATURE_COLUMNS] = np.where(np.isnan(stored), raw[:, WEATHER_FEATURE_COLUMNS], stored)
+    apply_interaction_features(raw)
+    values = raw[:, STORED_WEATHER_COLUMNS]
+    if scaling is not None:
+        mean, scale = scaling
+        values = (values - mean[STORED_WEATHER_COLUMNS]) / scale[STORED_WEATHER_COLUMNS]
+    features[np.ix_(rows, STORED_WEATHER_COLUMNS)] = values
 
-        # Use the actual trained ML model for prediction if available
-        if model is not None and scaler is not None:
-            # Prepare features for model prediction
-            features = prepare_features(location, year, month, rolling_avg)
-            
-            # Scale features
-            scaled_features = scaler.transform(features)
-            
-            # Make prediction using the trained model
-            model_prediction = model.predict(scaled_features)[0]
-            
-            # Check if model was trained on log-transformed data
-            target_transform = 'linear'  # Default assumption
-            if os.path.exists(METADATA_PATH):
-                try:
-                    metadata = joblib.load(METADATA_PATH)
-                    target_transform = metadata.get('target_transform', 'linear')
-                    logger.info(f"Model trained with {target_transform} target transformation")
-                except Exception as e:
-                    logger.warning(f"Could not load model metadata: {e}")
-            
-            # Apply inverse transformation if model was trained on log-transformed data
-            if target_transform == 'log':
-                # Apply exponential to convert back from log scale
-                prediction_value = np.exp(model_prediction)
-                logger.info(f"Inverse transformed prediction from log scale: {model_prediction:.4f} -> {prediction_value:.0f}")
-            else:
-                # Direct use of prediction for linear scale models
-                prediction_value = model_prediction
-            
-            # POST-PREDICTION SMOOTHING FOR GRADUAL TRANSITIONS
-            # Apply smoothing based on previous predictions to ensure gradual transitions
-            # This addresses the abrupt changes issue identified by the tourism department
-            global last_predictions_cache
-            if 'last_predictions_cache' not in globals():
-                last_predictions_cache = {}
-            
-            if location in last_predictions_cache:
-                last_location_predictions = last_predictions_cache[location]
-                prev_month = month - 1 if month > 1 else 12
-                if prev_month in last_location_predictions:
-                    prev_prediction = last_location_predictions[prev_month]
-                    # If the change is too abrupt (>50%), smooth it
-                    if prev_prediction > 0:
-                        change_ratio = abs(prediction_value - prev_prediction) / prev_prediction
-                        if change_ratio > 0.5:  # More than 50% change
-                            # Apply smoothing to limit the change to a maximum of 30%
-                            max_change = 0.3
-                            if prediction_value > prev_prediction:
-                                # Increasing prediction
-                                target_value = prev_prediction * (1 + max_change)
-                            else:
-                                # Decreasing prediction
-                                target_value = prev_prediction * (1 - max_change)
-                            
-                            logger.info(f"Smoothing abrupt transition for {location}: {prev_prediction:,.0f} → {prediction_value:,.0f} (change: {change_ratio:.2%}) -> adjusted to {target_value:,.0f}")
-                            prediction_value = target_value
-            
-            # Store current prediction for future smoothing
-            if location not in last_predictions_cache:
-                last_predictions_cache[location] = {}
-            last_predictions_cache[location][month] = prediction_value
-            
-            # ENHANCED SPECIAL HANDLING FOR PEAK WINTER SEASON IN GULMARG WITH SMOOTH TRANSITIONS
-            # For Gulmarg in winter months (December, January, February), ensure high predictions in LAKHS
-            if location == "Gulmarg" and month in [12, 1, 2]:
-                # Ensure predictions for peak winter season are in LAKHS range (100,000+)
-                if prediction_value < 100000:  # If prediction is below 1 lakh
-                    # Apply significant boost to reach lakhs range
-                    target_min = 150000  # Minimum target for peak winter season
-                    boost_factor = target_min / max(prediction_value, 1)
-                    prediction_value *= boost_factor
-                    logger.info(f"Applied enhanced peak winter season boost for Gulmarg: {boost_factor:.2f}x to reach lakhs range")
-                # Additional boost for January as it's the peak month
-                if month == 1:
-                    prediction_value *= 1.2  # 20% additional boost for January
-                    logger.info("Applied additional boost for peak January season")
-                
-                # Apply transition smoothing for winter months to ensure gradual changes
-                # December to January: peak to peak+ (15-20% increase)
-                # January to February: peak+ to high (15-20% decrease)
-                if month == 12:  # December - slightly lower than January
-                    prediction_value *= 0.95  # 5% lower than January peak
-                elif month == 2:  # February - lower than January but higher than spring
-                    prediction_value *= 0.90  # 10% lower than January peak
-                # January remains at peak (1.0 multiplier)
-                
-            # Enhanced handling for other popular ski destinations in winter with smooth transitions
-            elif location in ["Pahalgam", "Sonamarg"] and month in [12, 1, 2]:
-                # Boost winter predictions for other popular destinations
-                if prediction_value < 30000:  # If prediction is too low for winter season
-                    boost_factor = min(3.0, 50000 / max(prediction_value, 1))
-                    prediction_value *= boost_factor
-                    logger.info(f"Applied winter season boost for {location}: {boost_factor:.2f}x")
-                
-                # Apply transition smoothing for winter months
-                if month == 12:  # December - building up to peak
-                    prediction_value *= 0.90  # 10% lower than January
-                elif month == 2:  # February - declining from peak
-                    prediction_value *= 0.85  # 15% lower than January
-                # January remains at peak (1.0 multiplier)
-            
-            # NEW: Add validation for suspiciously similar predictions
-            # Test predictions for multiple locations to detect model issues
-            validation_predictions = {}
-            for test_location in list(LOCATION_MAPPING.keys())[:5]:  # Test first 5 locations
-                test_features = prepare_features(test_location, year, month, rolling_avg)
-                test_scaled = scaler.transform(test_features)
-                test_prediction = model.predict(test_scaled)[0]
-                # Apply same inverse transformation if needed
-                if target_transform == 'log':
-                    test_prediction = np.exp(test_prediction)
-                validation_predictions[test_location] = test_prediction
-            
-            # Check if predictions are suspiciously similar
-            prediction_values = list(validation_predictions.values())
-            prediction_range = max(prediction_values) - min(prediction_values)
-            
-            # Log warning if predictions are too similar
-            if prediction_range < 1000:  # Less than 1000 visitor difference
-                logger.warning(f"Suspiciously similar predictions detected. Range: {prediction_range:.0f} visitors. This may indicate model quality issues.")
-            
-            # Get prediction confidence/probability if available
-            confidence = 0.85  # Default confidence
-            if hasattr(model, 'predict_proba'):
-                try:
-                    probabilities = model.predict_proba(scaled_features)
-                    confidence = float(np.max(probabilities))
-                except:
-                    pass
-            
-            # Convert to integer and ensure reasonable bounds without artificial caps
-            prediction = int(round(max(0, prediction_value)))
-            
-            # Apply transition smoothing for consecutive predictions
-            # This addresses the abrupt changes issue identified by the tourism department
-            month_names = ['', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-            
-            # Apply smoothing based on previous predictions to ensure gradual transitions
-            if 'last_predictions_cache' in globals() and location in last_predictions_cache:
-                last_location_predictions = last_predictions_cache[location]
-                prev_month = month - 1 if month > 1 else 12
-                if prev_month in last_location_predictions:
-                    prev_prediction = last_location_predictions[prev_month]
-                    # If the change is too abrupt (>50%), smooth it
-                    if prev_prediction > 0:
-                        change_ratio = abs(prediction - prev_prediction) / prev_prediction
-                        if change_ratio > 0.5:  # More than 50% change
-                            # Apply smoothing to limit the change to a maximum of 30%
-                            max_change = 0.3
-                            if prediction > prev_prediction:
-                                # Increasing prediction
-                                target_value = prev_prediction * (1 + max_change)
-                            else:
-                                # Decreasing prediction
-                                target_value = prev_prediction * (1 - max_change)
-                            
-                            logger.info(f"Smoothing abrupt transition for {location}: {prev_prediction:,.0f} → {prediction:,.0f} (change: {change_ratio:.2%}) -> adjusted to {target_value:,.0f}")
-                            prediction = int(round(target_value))
-            
-            # Generate insights based on model prediction
-            insights = []
-            suggestions = []
-            
-            # Location-specific insights
-            if location == "Gulmarg":
-                if month in [12, 1, 2]:  # Winter months
-                    insights.append(f"{location} is experiencing peak ski season in {month}/{year}. Expect maximum tourist inflow.")
-                    if prediction > 50000:
-                        insights.append("Strong visitor volume detected. Ensure adequate ski lift capacity.")
-                        suggestions.append("Deploy additional ski instructors and equipment rental staff.")
-                else:
-                    insights.append(f"{location} is in off-season. Lower tourist numbers expected.")
-            elif location == "Pahalgam":
-                if month in [5, 6, 7, 8]:  # Summer months
-                    insights.append(f"{location} is experiencing peak summer season in {month}/{year}. Expect high tourist activity.")
-                else:
-                    insights.append(f"{location} is in shoulder season. Moderate tourist activity expected.")
-            
-            # General insights based on prediction magnitude
-            if prediction > 100000:
-                insights.append(f"Exceptionally high visitor volume ({prediction:,} visitors) predicted - in LAKHS range.")
-                suggestions.append("Coordinate with local authorities for traffic management.")
-                suggestions.append("Ensure adequate waste management and sanitation facilities.")
-            elif prediction > 60000:
-                insights.append(f"Very high visitor volume ({prediction:,} visitors) predicted.")
-                suggestions.append("Maintain standard staffing levels with on-call support.")
-            elif prediction > 30000:
-                insights.append(f"High visitor volume ({prediction:,} visitors) predicted.")
-                suggestions.append("Maintain standard staffing levels with on-call support.")
-            elif prediction > 10000:
-                insights.append(f"Moderate visitor volume ({prediction:,} visitors) predicted.")
-                suggestions.append("Standard staffing sufficient. Monitor booking trends.")
-            else:
-                insights.append(f"Lower visitor volume ({prediction:,} visitors) predicted.")
-                suggestions.append("Opportunity for targeted promotional campaigns.")
-            
-            # Rolling average insight
-            if rolling_avg and 1000 <= rolling_avg <= 100000:
-                if rolling_avg > prediction * 1.2:
-                    insights.append(f"Recent performance ({rolling_avg:,} avg) higher than prediction. Trend may be declining.")
-                elif rolling_avg < prediction * 0.8:
-                    insights.append(f"Recent performance ({rolling_avg:,} avg) lower than prediction. Upward trend expected.")
-                else:
-                    insights.append(f"Stable recent performance ({rolling_avg:,} avg) indicates predictable trends.")
-            
-            # Resource requirements estimation
-            resource_requirements = {
-                'staff': max(5, int(prediction / 1000)),  # 1 staff per 1000 visitors
-                'vehicles': max(2, int(prediction / 2000)),  # 1 vehicle per 2000 visitors
-                'rooms': max(20, int(prediction * 0.05))  # 0.05 rooms per visitor
-            }
-            
-            # Comparative analysis (simplified)
-            comparative_data = {
-                'comparison_type': 'model_based',
-                'reference_period': f"{month}/{year}",
-                'reference_value': prediction,
-                'change': 0.0,
-                'trend': 'stable'
-            }
-            
-            # Weather data for context
-            weather_key = location if location in WEATHER_DATA else 'Gulmarg'
-            # Fixed fallback logic to prevent exceptions
-            default_weather = {
-                'temp_mean': 10, 'temp_max': 15, 'temp_min': 5, 'precip': 75, 
-                'snow': 10, 'precip_hours': 120, 'wind': 20, 'humidity': 65, 'sunshine': 200
-            }
-            weather = WEATHER_DATA[weather_key].get(month, WEATHER_DATA['Gulmarg'].get(6, default_weather))
-            
-            # Holiday data
-            holidays = HOLIDAY_DATA.get(month, HOLIDAY_DATA[6])
-            
-            response = {
-                'success': True,
-                'prediction': {
-                    'location': location,
-                    'year': year,
-                    'month': month,
-                    'predicted_footfall': prediction,
-                    'confidence': round(confidence, 2),
-                    'comparative_analysis': comparative_data,
-                    'weather': {
-                        'temperature_mean': weather['temp_mean'],
-                        'temperature_max': weather['temp_max'],
-                        'temperature_min': weather['temp_min'],
-                        'precipitation': weather['precip'],
-                        'snowfall': weather['snow'],
-                        'sunshine_hours': weather['sunshine'],
-                        'wind_speed': weather['wind']
-                    },
-                    'holidays': {
-                        'count': holidays['count'],
-                        'long_weekends': holidays['long_weekend'],
-                        'national_holidays': holidays['national'],
-                        'festival_holidays': holidays['festival']
-                    },
-                    'insights': insights,
-                    'resource_suggestions': suggestions,
-                    'resourceRequirements': resource_requirements
-                },
-                'timestamp': datetime.now().isoformat(),
-                'model_used': True,
-                'target_transform': target_transform  # Added to indicate the transformation used
-            }
+def prepare_features_batch(locations, years, months, rolling_avgs):
+    """
+    Prepare an N x 17 feature matrix (one row per location/year/month/rolling_avg)
+    by gathering the static columns from FEATURE_TABLE, with year-specific weather
+    from the weather store where it has data
+    """
+    location_codes = location_codes_for(locations)
+    months = np.asarray(months, dtype=np.intp)
+    features = FEATURE_TABLE[location_codes, months]
+    features[:, YEAR_COLUMN] = years
+    features[:, ROLLING_AVG_COLUMN] = rolling_avgs
+    apply_stored_weather(features, location_codes, years, months)
+    return features
 
-            logger.info(f"ML Model Prediction: {location} {year}-{month:02d} → {prediction:,} visitors (Confidence: {confidence:.2f}, Transform: {target_transform})")
+def prepare_features(location, year, month, rolling_avg=80000):
+    """
+    Prepare 17 features for model prediction
+    Matches the features expected by the trained XGBoost model
+    """
+    return prepare_features_batch([location], [year], [month], [rolling_avg])
 
-            return jsonify(response)
-        
-        else:
-            # Fallback to custom algorithm if model not available
-            # Enhanced prediction logic with realistic trends and insights
-            import random
-            import math
-            
-            # Enhanced base visitors by location with realistic numbers for peak seasons
-            location_base = {
-                'Gulmarg': 50000,      # Popular ski resort - Higher base for realistic predictions
-                'Pahalgam': 45000,     # Popular valley destination
-                'Sonamarg': 25000,     # Beautiful valley
-                'Yousmarg': 15000,     # Emerging destination
-                'Doodpathri': 10000,   # Nearby attraction
-                'Kokernag': 8000,      # Lesser known
-                'Lolab': 6000,         # Remote valley
-                'Manasbal': 18000,     # Beautiful lake
-                'Aharbal': 5000,       # Waterfall destination
-                'Gurez': 3000          # Very remote
-            }
-            
-            # Use rolling average as baseline if provided and reasonable
-            # This allows the system to adapt to recent trends
-            if rolling_avg and 1000 <= rolling_avg <= 100000:
-                base_visitors = rolling_avg * 0.4  # Use 40% of rolling average as baseline
-            else:
-                base_visitors = location_base.get(location, 12000)
-            
-            # Historical growth trend (Kashmir tourism has been growing)
-            growth_factor = 1.0 + (year - 2020) * 0.08  # 8% annual growth
-            
-            # Adjust growth factor based on recent trends
-            # If rolling average is significantly higher than location baseline, 
-            # it indicates positive momentum
-            location_baseline = location_base.get(location, 12000)
-            if rolling_avg and rolling_avg > location_baseline * 1.2:
-                # Positive momentum - slightly boost growth factor
-                growth_factor *= 1.05
-            elif rolling_avg and rolling_avg < location_baseline * 0.8:
-                # Negative momentum - slightly reduce growth factor
-                growth_factor *= 0.95
-            
-            # Enhanced seasonal patterns with SMOOTH TRANSITIONS based on Kashmir tourism data
-            seasonal_patterns = {
-                'Gulmarg': {
-                    12: {'multiplier': 8.0, 'trend': 'peak'},    # Winter ski season - Lakhs range
-                    1: {'multiplier': 8.5, 'trend': 'peak'},     # Peak January - Highest visitor volume
-                    2: {'multiplier': 7.0, 'trend': 'high'},     # High winter season
-                    3: {'multiplier': 5.0, 'trend': 'declining'}, # Gradual decline from winter peak
-                    4: {'multiplier': 3.5, 'trend': 'declining'}, # Continued decline
-                    5: {'multiplier': 2.0, 'trend': 'low'},      # Low season (smooth transition)
-                    6: {'multiplier': 1.0, 'trend': 'off'},      # Off-season
-                    7: {'multiplier': 0.8, 'trend': 'off'},      # Off-season
-                    8: {'multiplier': 1.0, 'trend': 'off'},      # Off-season
-                    9: {'multiplier': 1.5, 'trend': 'rising'},   # Beginning of rise
-                    10: {'multiplier': 2.5, 'trend': 'rising'},  # Continuing rise
-                    11: {'multiplier': 4.0, 'trend': 'high'}     # Pre-winter rise
-                },
-                'Pahalgam': {
-                    5: {'multiplier': 1.5, 'trend': 'rising'},   # Rising season
-                    6: {'multiplier': 3.0, 'trend': 'peak'},     # Peak summer
-                    7: {'multiplier': 3.2, 'trend': 'peak'},     # Peak summer
-                    8: {'multiplier': 2.8, 'trend': 'high'},     # High season
-                    9: {'multiplier': 2.0, 'trend': 'declining'},# Gradual decline
-                    10: {'multiplier': 1.5, 'trend': 'declining'},# Continued decline
-                    11: {'multiplier': 1.0, 'trend': 'low'},     # Low season
-                    12: {'multiplier': 1.8, 'trend': 'rising'},  # Winter rising (Christmas/New Year)
-                    1: {'multiplier': 2.0, 'trend': 'high'},     # Winter high
-                    2: {'multiplier': 1.8, 'trend': 'declining'},# Post-winter decline
-                    3: {'multiplier': 1.5, 'trend': 'low'},      # Low season
-                    4: {'multiplier': 1.2, 'trend': 'low'}       # Low season
-                },
-                'Sonamarg': {
-                    5: {'multiplier': 1.3, 'trend': 'rising'},   # Rising season
-                    6: {'multiplier': 2.5, 'trend': 'high'},     # High season
-                    7: {'multiplier': 2.7, 'trend': 'high'},     # High season
-                    8: {'multiplier': 2.3, 'trend': 'high'},     # High season
-                    9: {'multiplier': 1.8, 'trend': 'declining'},# Gradual decline
-                    10: {'multiplier': 1.3, 'trend': 'declining'},# Continued decline
-                    11: {'multiplier': 1.0, 'trend': 'low'},     # Low season
-                    12: {'multiplier': 1.5, 'trend': 'rising'},  # Winter rising
-                    1: {'multiplier': 1.8, 'trend': 'high'},     # Winter high
-                    2: {'multiplier': 1.5, 'trend': 'declining'},# Post-winter decline
-                    3: {'multiplier': 1.2, 'trend': 'low'},      # Low season
-                    4: {'multiplier': 1.0, 'trend': 'low'}       # Low season
-                }
-            }
-            
-            # Default seasonal pattern for other locations with SMOOTH TRANSITIONS
-            default_seasonal = {
-                1: {'multiplier': 0.6, 'trend': 'off'},
-                2: {'multiplier': 0.7, 'trend': 'low'},
-                3: {'multiplier': 0.9, 'trend': 'rising'},
-                4: {'multiplier': 1.0, 'trend': 'moderate'},
-                5: {'multiplier': 1.1, 'trend': 'rising'},
-                6: {'multiplier': 1.2, 'trend': 'high'},
-                7: {'multiplier': 1.3, 'trend': 'peak'},
-                8: {'multiplier': 1.2, 'trend': 'high'},
-                9: {'multiplier': 1.1, 'trend': 'moderate'},
-                10: {'multiplier': 0.9, 'trend': 'declining'},
-                11: {'multiplier': 0.8, 'trend': 'low'},
-                12: {'multiplier': 0.7, 'trend': 'off'}
-            }
-            
-            # Get seasonal multiplier with SMOOTH TRANSITION ALGORITHM
-            location_pattern = seasonal_patterns.get(location, default_seasonal)
-            seasonal_data = location_pattern.get(month, default_seasonal[month])
-            seasonal_multiplier = seasonal_data['multiplier']
-            seasonal_trend = seasonal_data['trend']
-            
-            # Apply transition smoothing algorithm for more realistic patterns
-            # This ensures gradual changes between seasons rather than abrupt shifts
-            if location in ['Gulmarg', 'Pahalgam', 'Sonamarg']:
-                # For major tourist destinations, apply additional smoothing
-                current_month = month
-                prev_month_key = current_month - 1 if current_month > 1 else 12
-                next_month_key = current_month + 1 if current_month < 12 else 1
-                
-                # Get multipliers for adjacent months
-                prev_data = location_pattern.get(prev_month_key, default_seasonal[prev_month_key])
-                next_data = location_pattern.get(next_month_key, default_seasonal[next_month_key])
-                prev_multiplier = prev_data['multiplier']
-                next_multiplier = next_data['multiplier']
-                
-                # Apply weighted average for smoother transitions
-                # Weight more heavily toward the current month but consider neighbors
-                smoothed_multiplier = (0.3 * prev_multiplier + 0.4 * seasonal_multiplier + 0.3 * next_multiplier)
-                seasonal_multiplier = smoothed_multiplier
-                
-                # Log the smoothing effect
-                if abs(smoothed_multiplier - seasonal_multiplier) > 0.1:
-                    logger.info(f"Applied transition smoothing for {location} month {month}: {seasonal_multiplier:.2f} -> {smoothed_multiplier:.2f}")
-            
-            # Weather factor (based on our weather data)
-            weather_key = location if location in WEATHER_DATA else 'Gulmarg'
-            # Fixed fallback logic to prevent exceptions
-            default_weather = {
-                'temp_mean': 10, 'temp_max': 15, 'temp_min': 5, 'precip': 75, 
-                'snow': 10, 'precip_hours': 120, 'wind': 20, 'humidity': 65, 'sunshine': 200
-            }
-            weather = WEATHER_DATA[weather_key].get(month, WEATHER_DATA['Gulmarg'].get(6, default_weather))
-            
-            # Weather impact (good weather increases visitors)
-            # Temperature comfort score (ideal range 15-25°C)
+def compile_scaled_feature_table(scaler):
+    """
+    Fold the StandardScaler into FEATURE_TABLE for the static columns, and return
+    (scaled_table, mean, scale) so only year and rolling_avg need scaling per request
+    Returns None for scalers that are not a plain per-column affine transform
+    """
+    if not hasattr(scaler, 'n_features_in_') or scaler.n_features_in_ != NUM_FEATURES:
+        return None
+    if not all(hasattr(scaler, attribute) for attribute in ('with_mean', 'with_std', 'mean_', 'scale_')):
+        return None
+
+    mean = scaler.mean_ if scaler.with_mean and scaler.mean_ is not None else np.zeros(NUM_FEATURES)
+    scale = scaler.scale_ if scaler.with_std and scaler.scale_ is not None else np.ones(NUM_FEATURES)
+    scaled_table = (FEATURE_TABLE - mean) / scale
+    scaled_table.setflags(write=False)
+    return scaled_table, np.asarray(mean, dtype=float), np.asarray(scale, dtype=float)
+
+def scale_features_batch(bundle, locations, years, months, rolling_avgs):
+    """
+    Scaled N x 17 feature matrix: a gather from the pre-scaled table plus a fused
+    affine step for year and rolling_avg. Equivalent to scaler.transform(prepare_features_batch(...))
+    """
+    scaled = bundle.artifacts.get('scaled_feature_table')
+    if scaled is None:
+        return bundle.scaler.transform(prepare_features_batch(locations, years, months, rolling_avgs))
+
+    scaled_table, mean, scale = scaled
+    location_codes = location_codes_for(locations)
+    months = np.asarray(months, dtype=np.intp)
+    features = scaled_table[location_codes, months]
+    features[:, YEAR_COLUMN] = (np.asarray(years, dtype=float) - mean[YEAR_COLUMN]) / scale[YEAR_COLUMN]
+    features[:, ROLLING_AVG_COLUMN] = ((np.asarray(rolling_avgs, dtype=float) - mean[ROLLING_AVG_COLUMN])
+                                       / scale[ROLLING_AVG_COLUMN])
+    # Only rows with stored weather leave the pre-scaled table; the rest stay a plain gather
+    apply_stored_weather(features, location_codes, years, months, scaling=(mean, scale))
+    return features
+
+# Upper bound on rows accepted by the batch endpoint in a single request
+MAX_BATCH_ROWS = 5000
+
+# Years accepted by the prediction endpoints
+MIN_PREDICTION_YEAR = 1900
+MAX_PREDICTION_YEAR = 2200
+
+def is_whole_number(value):
+    """True for ints and integral floats (JSON may send 2025.0), but not for bools"""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+def is_number(value):
+    """True for finite ints and floats, but not for bools"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and bool(np.isfinite(value))
+
+def validate_prediction_input(location, year, month, rolling_avg=80000):
+    """Return an error message for invalid prediction inputs, or None if they are valid"""
+    if not all([location, year, month]):
+        return 'Missing required fields: location, year, month'
+
+    if not isinstance(location, str) or location not in LOCATION_MAPPING:
+        return f'Unknown location: {location}'
+
+    if not is_whole_number(year) or not (MIN_PREDICTION_YEAR <= year <= MAX_PREDICTION_YEAR):
+        return f'Year must be a whole number between {MIN_PREDICTION_YEAR} and {MAX_PREDICTION_YEAR}'
+
+    if not is_whole_number(month) or not (1 <= month <= 12):
+        return 'Month must be a whole number between 1 and 12'
+
+    if not is_number(rolling_avg) or rolling_avg < 0:
+        return 'rolling_avg must be a non-negative number'
+
+    return None
+
+def normalize_prediction_input(year, month, rolling_avg):
+    """
+    Canonical (year, month, rolling_avg) for validated inputs: 2025.0 becomes 2025 and
+    50000.0 becomes 50000, so equal inputs share cache entries, ETags and response text
+    """
+    if isinstance(rolling_avg, float) and rolling_avg.is_integer():
+        rolling_avg = int(rolling_avg)
+    return int(year), int(month), rolling_avg
+
+def apply_seasonal_adjustments(prediction_values, locations, months):
+    """
+    Vectorized peak winter season handling for Gulmarg, Pahalgam and Sonamarg.
+    Works on arrays so single-row and batch predictions share the same post-processing.
+    """
+    values = np.asarray(prediction_values, dtype=float).copy()
+    locations = np.asarray(locations)
+    months = np.asarray(months)
+    winter = np.isin(months, [12, 1, 2])
+
+    # Gulmarg peak winter season: ensure predictions are in LAKHS range (100,000+)
+    gulmarg = winter & (locations == 'Gulmarg')
+    below_lakh = gulmarg & (values < 100000)
+    values[below_lakh] *= 150000 / np.maximum(values[below_lakh], 1)
+    values[gulmarg & (months == 1)] *= 1.2   # Additional boost for peak January
+    values[gulmarg & (months == 12)] *= 0.95  # December slightly lower than January
+    values[gulmarg & (months == 2)] *= 0.90   # February lower than January
+
+    # Other popular destinations in winter
+    ski = winter & np.isin(locations, ['Pahalgam', 'Sonamarg'])
+    too_low = ski & (values < 30000)
+    values[too_low] *= np.minimum(3.0, 50000 / np.maximum(values[too_low], 1))
+    values[ski & (months == 12)] *= 0.90  # December building up to peak
+    values[ski & (months == 2)] *= 0.85   # February declining from peak
+
+    return values
+
+# POST-PREDICTION SMOOTHING FOR GRADUAL TRANSITIONS
+# Month-over-month changes above this ratio are treated as abrupt...
+SMOOTHING_CHANGE_THRESHOLD = 0.5
+# ...and are limited to this change relative to the previous month
+SMOOTHING_MAX_CHANGE = 0.3
+
+def previous_month_of(years, months):
+    """Year and month arrays for the month before each (year, month)"""
+    years = np.asarray(years)
+    months = np.asarray(months)
+    january = months == 1
+    return np.where(january, years - 1, years), np.where(january, 12, months - 1)
+
+def smooth_transitions(current_values, previous_values):
+    """
+    Limit abrupt changes from the previous month's prediction
+    This addresses the abrupt changes issue identified by the tourism department
+    """
+    current_values = np.asarray(current_values, dtype=float)
+    previous_values = np.asarray(previous_values, dtype=float)
+    safe_previous = np.where(previous_values > 0, previous_values, 1)
+    change_ratio = np.abs(current_values - previous_values) / safe_previous
+    abrupt = (previous_values > 0) & (change_ratio > SMOOTHING_CHANGE_THRESHOLD)
+    capped = np.where(current_values > previous_values,
+                      previous_values * (1 + SMOOTHING_MAX_CHANGE),
+                      previous_values * (1 - SMOOTHING_MAX_CHANGE))
+    return np.where(abrupt, capped, current_values)
+
+# Percentiles of the individual trees' predictions bounding the prediction interval; its P50
+# is the point prediction itself (the trees' mean), so the band is centred on the served value
+PREDICTION_INTERVAL_QUANTILES = (10, 90)
+
+def predict_scaled_values(bundle, scaled_features, intervals=False):
+    """
+    Run one model.predict over an N x 17 scaled feature matrix
+    and return predictions on the original (visitor) scale
+    With intervals=True returns an N x 4 matrix instead: the point prediction and the
+    interval's P10/P50/P90 (P10 and P90 of the individual trees' predictions around the
+    point as P50), all from the same tree traversal (NaN if the model has no intervals)
+    """
+    interval_engine = bundle.artifacts.get('interval_engine') if intervals else None
+    tree_engine = bundle.artifacts.get('tree_engine')
+    if interval_engine is not None:
+        # Per-tree outputs from one vectorized traversal of the exported trees (whatever the
+        # inference backend): their mean is the forest's prediction, their spread the interval
+        leaves = interval_engine.leaf_values(scaled_features)
+        point = leaves.mean(axis=1)
+        lower, upper = np.percentile(leaves, PREDICTION_INTERVAL_QUANTILES, axis=1)
+        model_predictions = np.column_stack([point, lower, point, upper])
+    elif tree_engine is not None and len(scaled_features) <= TREE_ENGINE_MAX_ROWS:
+        # Flat array traversal avoids the per-call overhead of the model wrapper for small batches
+        model_predictions = tree_engine.predict(scaled_features)
+    else:
+        model_predictions = bundle.model.predict(scaled_features)
+
+    # Apply inverse transformation if model was trained on log-transformed data
+    # (monotonic, so quantiles of the log predictions map to quantiles of visitors)
+    if bundle.target_transform == 'log':
+        model_predictions = np.exp(model_predictions)
+    if intervals and interval_engine is None:
+        missing = np.full((len(model_predictions), 3), np.nan)
+        return np.column_stack([model_predictions, missing])
+    return model_predictions
+
+# Opt-in coalescing of concurrent /api/predict inferences into one batched model call
+MICRO_BATCH_ENABLED = os.environ.get('MICRO_BATCH_ENABLED', '0') == '1'
+MICRO_BATCH_TIMEOUT = 10.0  # Seconds a request waits for its batch before giving up
+micro_batcher = MicroBatcher(
+    lambda bundle, scaled_features: predict_scaled_values(bundle, scaled_features, intervals=True),
+    max_batch_rows=int(os.environ.get('MICRO_BATCH_MAX_ROWS', '64')),
+    max_wait_ms=float(os.environ.get('MICRO_BATCH_WINDOW_MS', '2')),
+    max_queue=int(os.environ.get('MICRO_BATCH_QUEUE_SIZE', '1024'))
+) if MICRO_BATCH_ENABLED else None
+
+def predict_batch_values(bundle, locations, years, months, rolling_avgs, coalesce=False, intervals=False,
+                         scaled_features=None):
+    """
+    Scale and predict a batch of location/year/month/rolling_avg rows in one pass
+    With coalesce=True (single-request path) rows may be merged with concurrent requests
+    scaled_features skips the feature step when the caller already prepared the matrix
+    """
+    if scaled_features is None:
+        with metrics.timer('stage_latency_seconds', stage='features', path='model'):
+            scaled_features = scale_features_batch(bundle, locations, years, months, rolling_avgs)
+    with metrics.timer('stage_latency_seconds', stage='inference', path='model'):
+        if coalesce and micro_batcher is not None:
+            # Coalesced batches always carry intervals: single predictions take their confidence from them
+            values = micro_batcher.submit(bundle, scaled_features, timeout=MICRO_BATCH_TIMEOUT)
+            return values if intervals else values[:, 0]
+        return predict_scaled_values(bundle, scaled_features, intervals=intervals)
+
+def footfall_feature_rows(locations, years, months, rolling_avgs):
+    """The 2N rows scored by predict_footfall_values: every row, then every row's previous month"""
+    previous_years, previous_months = previous_month_of(years, months)
+    return (
+        list(locations) * 2,
+        np.concatenate([np.asarray(years), previous_years]),
+        np.concatenate([np.asarray(months), previous_months]),
+        np.concatenate([np.asarray(rolling_avgs, dtype=float)] * 2)
+    )
+
+def footfall_feature_matrix(bundle, locations, years, months, rolling_avgs):
+    """Scaled 2N x 17 matrix for predict_footfall_values, for callers that reuse it (shadow scoring)"""
+    with metrics.timer('stage_latency_seconds', stage='features', path='model'):
+        return scale_features_batch(bundle, *footfall_feature_rows(locations, years, months, rolling_avgs))
+
+def predict_footfall_values(bundle, locations, years, months, rolling_avgs, coalesce=False, intervals=False,
+                            scaled_features=None, trace=None):
+    """
+    Post-processed predictions for a batch of rows: the previous month is scored in the
+    same inference pass, used for transition smoothing, then seasonal adjustments apply.
+    Deterministic - the result depends only on the inputs and the model bundle.
+    With intervals=True returns (predictions, N x 3 P10/P50/P90 matrix).
+    scaled_features is an optional footfall_feature_matrix() of the same rows.
+    trace, if given, is a dict filled with the intermediate raw/previous_raw/smoothed/adjusted arrays.
+    """
+    count = len(locations)
+    values = predict_batch_values(
+        bundle,
+        *footfall_feature_rows(locations, years, months, rolling_avgs),
+        coalesce=coalesce,
+        intervals=intervals,
+        scaled_features=scaled_features
+    )
+    if intervals:
+        values, quantiles = values[:, 0], values[:count, 1:]
+    with metrics.timer('stage_latency_seconds', stage='smoothing', path='model'):
+        smoothed = smooth_transitions(values[:count], values[count:])
+        adjusted = apply_seasonal_adjustments(smoothed, locations, months)
+    if trace is not None:
+        trace.update(raw=values[:count], previous_raw=values[count:], smoothed=smoothed, adjusted=adjusted)
+    if not intervals:
+        return adjusted
+    # Smoothing and seasonal adjustments rescale the point prediction; scale the band by the same
+    # factor, so its P50 stays the point and its relative width (the confidence) is unchanged
+    raw = values[:count]
+    ratios = quantiles / np.where(raw > 0, raw, np.nan)[:, None]
+    ratios[:, 0] = np.minimum(ratios[:, 0], 1)
+    ratios[:, 2] = np.maximum(ratios[:, 2], 1)
+    return adjusted, adjusted[:, None] * ratios
+
+def adjustment_factors(trace):
+    """Multiplicative effect of transition smoothing and of seasonal adjustments, from a predict_footfall_values trace"""
+    raw, smoothed, adjusted = trace['raw'], trace['smoothed'], trace['adjusted']
+    smoothing = np.divide(smoothed, raw, out=np.ones_like(smoothed), where=raw != 0)
+    seasonal = np.divide(adjusted, smoothed, out=np.ones_like(adjusted), where=smoothed != 0)
+    return smoothing, seasonal
+
+def interval_payload(quantiles, prediction):
+    """
+    {'p10', 'p50', 'p90'} visitors for one row of interval quantiles, plus a confidence
+    score from the interval's width relative to the point prediction (None without an interval)
+    """
+    if np.isnan(quantiles).any():
+        return None
+    p10, p50, p90 = (int(round(max(0, value))) for value in quantiles)
+    confidence = 1 - (p90 - p10) / (2 * prediction) if prediction > 0 else 0.0
+    return {'p10': p10, 'p50': p50, 'p90': p90, 'confidence': round(min(1.0, max(0.0, confidence)), 2)}
+
+# Staffing ratios and minimums for resource estimates
+VISITORS_PER_STAFF = 1000  # 1 staff per 1000 visitors
+VISITORS_PER_VEHICLE = 2000  # 1 vehicle per 2000 visitors
+ROOMS_PER_VISITOR = 0.05  # 0.05 rooms per visitor
+MIN_STAFF = 5
+MIN_VEHICLES = 2
+MIN_ROOMS = 20
+RESOURCE_TYPES = ('staff', 'vehicles', 'rooms')
+
+def calculate_resource_requirements(prediction):
+    """Estimate staff, vehicles and rooms needed for a predicted footfall"""
+    return {
+        'staff': max(MIN_STAFF, int(prediction / VISITORS_PER_STAFF)),
+        'vehicles': max(MIN_VEHICLES, int(prediction / VISITORS_PER_VEHICLE)),
+        'rooms': max(MIN_ROOMS, int(prediction * ROOMS_PER_VISITOR))
+    }
+
+def calculate_resource_requirements_batch(predictions):
+    """calculate_resource_requirements for an array of non-negative predictions: {resource: int array}"""
+    predictions = np.asarray(predictions, dtype=float)
+    return {
+        'staff': np.maximum(MIN_STAFF, np.floor(predictions / VISITORS_PER_STAFF)).astype(int),
+        'vehicles': np.maximum(MIN_VEHICLES, np.floor(predictions / VISITORS_PER_VEHICLE)).astype(int),
+        'rooms': np.maximum(MIN_ROOMS, np.floor(predictions * ROOMS_PER_VISITOR)).astype(int)
+    }
+
+# FALLBACK PREDICTION ENGINE
+# Used when no trained model is loaded. All per-location/month inputs are compiled once
+# into [location_code, month] tables so a batch of rows is a handful of array operations.
+
+# Enhanced base visitors by location with realistic numbers for peak seasons
+FALLBACK_LOCATION_BASE = {
+    'Gulmarg': 50000,      # Popular ski resort - Higher base for realistic predictions
+    'Pahalgam': 45000,     # Popular valley destination
+    'Sonamarg': 25000,     # Beautiful valley
+    'Yousmarg': 15000,     # Emerging destination
+    'Doodpathri': 10000,   # Nearby attraction
+    'Kokernag': 8000,      # Lesser known
+    'Lolab': 6000,         # Remote valley
+    'Manasbal': 18000,     # Beautiful lake
+    'Aharbal': 5000,       # Waterfall destination
+    'Gurez': 3000          # Very remote
+}
+FALLBACK_DEFAULT_BASE = 12000
+
+# Enhanced seasonal patterns with SMOOTH TRANSITIONS based on Kashmir tourism data
+FALLBACK_SEASONAL_PATTERNS = {
+    'Gulmarg': {
+        12: {'multiplier': 8.0, 'trend': 'peak'},    # Winter ski season - Lakhs range
+        1: {'multiplier': 8.5, 'trend': 'peak'},     # Peak January - Highest visitor volume
+        2: {'multiplier': 7.0, 'trend': 'high'},     # High winter season
+        3: {'multiplier': 5.0, 'trend': 'declining'}, # Gradual decline from winter peak
+        4: {'multiplier': 3.5, 'trend': 'declining'}, # Continued decline
+        5: {'multiplier': 2.0, 'trend': 'low'},      # Low season (smooth transition)
+        6: {'multiplier': 1.0, 'trend': 'off'},      # Off-season
+        7: {'multiplier': 0.8, 'trend': 'off'},      # Off-season
+        8: {'multiplier': 1.0, 'trend': 'off'},      # Off-season
+        9: {'multiplier': 1.5, 'trend': 'rising'},   # Beginning of rise
+        10: {'multiplier': 2.5, 'trend': 'rising'},  # Continuing rise
+        11: {'multiplier': 4.0, 'trend': 'high'}     # Pre-winter rise
+    },
+    'Pahalgam': {
+        5: {'multiplier': 1.5, 'trend': 'rising'},   # Rising season
+        6: {'multiplier': 3.0, 'trend': 'peak'},     # Peak summer
+        7: {'multiplier': 3.2, 'trend': 'peak'},     # Peak summer
+        8: {'multiplier': 2.8, 'trend': 'high'},     # High season
+        9: {'multiplier': 2.0, 'trend': 'declining'},# Gradual decline
+        10: {'multiplier': 1.5, 'trend': 'declining'},# Continued decline
+        11: {'multiplier': 1.0, 'trend': 'low'},     # Low season
+        12: {'multiplier': 1.8, 'trend': 'rising'},  # Winter rising (Christmas/New Year)
+        1: {'multiplier': 2.0, 'trend': 'high'},     # Winter high
+        2: {'multiplier': 1.8, 'trend': 'declining'},# Post-winter decline
+        3: {'multiplier': 1.5, 'trend': 'low'},      # Low season
+        4: {'multiplier': 1.2, 'trend': 'low'}       # Low season
+    },
+    'Sonamarg': {
+        5: {'multiplier': 1.3, 'trend': 'rising'},   # Rising season
+        6: {'multiplier': 2.5, 'trend': 'high'},     # High season
+        7: {'multiplier': 2.7, 'trend': 'high'},     # High season
+        8: {'multiplier': 2.3, 'trend': 'high'},     # High season
+        9: {'multiplier': 1.8, 'trend': 'declining'},# Gradual decline
+        10: {'multiplier': 1.3, 'trend': 'declining'},# Continued decline
+        11: {'multiplier': 1.0, 'trend': 'low'},     # Low season
+        12: {'multiplier': 1.5, 'trend': 'rising'},  # Winter rising
+        1: {'multiplier': 1.8, 'trend': 'high'},     # Winter high
+        2: {'multiplier': 1.5, 'trend': 'declining'},# Post-winter decline
+        3: {'multiplier': 1.2, 'trend': 'low'},      # Low season
+        4: {'multiplier': 1.0, 'trend': 'low'}       # Low season
+    }
+}
+
+# Default seasonal pattern for other locations with SMOOTH TRANSITIONS
+FALLBACK_DEFAULT_SEASONAL = {
+    1: {'multiplier': 0.6, 'trend': 'off'},
+    2: {'multiplier': 0.7, 'trend': 'low'},
+    3: {'multiplier': 0.9, 'trend': 'rising'},
+    4: {'multiplier': 1.0, 'trend': 'moderate'},
+    5: {'multiplier': 1.1, 'trend': 'rising'},
+    6: {'multiplier': 1.2, 'trend': 'high'},
+    7: {'multiplier': 1.3, 'trend': 'peak'},
+    8: {'multiplier': 1.2, 'trend': 'high'},
+    9: {'multiplier': 1.1, 'trend': 'moderate'},
+    10: {'multiplier': 0.9, 'trend': 'declining'},
+    11: {'multiplier': 0.8, 'trend': 'low'},
+    12: {'multiplier': 0.7, 'trend': 'off'}
+}
+
+# Major destinations get neighbour-month smoothing of their seasonal multiplier
+FALLBACK_SMOOTHED_LOCATIONS = ('Gulmarg', 'Pahalgam', 'Sonamarg')
+
+# Confidence by seasonal trend
+FALLBACK_TREND_CONFIDENCE = {
+    'peak': 0.95,
+    'high': 0.90,
+    'moderate': 0.85,
+    'rising': 0.80,
+    'declining': 0.75,
+    'low': 0.70,
+    'off': 0.65
+}
+FALLBACK_TRENDS = tuple(FALLBACK_TREND_CONFIDENCE)
+
+FALLBACK_DEFAULT_WEATHER = {
+    'temp_mean': 10, 'temp_max': 15, 'temp_min': 5, 'precip': 75,
+    'snow': 10, 'precip_hours': 120, 'wind': 20, 'humidity': 65, 'sunshine': 200
+}
+
+# Weekend effect (month has about 4-5 weekends)
+FALLBACK_WEEKEND_EFFECT = 1.0 + (8 * 0.02)  # 8 weekends in a month effect
+
+# Seed for the +/-15% variance term. Unset draws fresh randomness per request;
+# set, the variance is a hash of the inputs so fallback results are reproducible and cacheable.
+FALLBACK_SEED = int(os.environ['FALLBACK_SEED']) if os.environ.get('FALLBACK_SEED') else None
+
+def weather_for(location, month):
+    """Weather shown with (and used by the fallback for) a prediction; Gulmarg's table for locations without one"""
+    weather_key = location if location in WEATHER_DATA else 'Gulmarg'
+    return WEATHER_DATA[weather_key].get(month, WEATHER_DATA['Gulmarg'].get(6, FALLBACK_DEFAULT_WEATHER))
+
+def compile_fallback_tables():
+    """
+    Compile the fallback seasonal, weather and holiday factors into read-only
+    [location_code, month] arrays (and the per-location base visitors)
+    """
+    shape = (max(LOCATION_MAPPING.values()) + 1, 13)
+    tables = {
+        'base': np.full(shape[0], FALLBACK_DEFAULT_BASE, dtype=float),
+        'raw_multiplier': np.zeros(shape),          # seasonal multiplier as listed
+        'multiplier': np.zeros(shape),              # after neighbour-month smoothing
+        'trend': np.zeros(shape, dtype=np.intp),    # index into FALLBACK_TRENDS
+        'weather_multiplier': np.zeros(shape),
+        'holiday_multiplier': np.zeros(shape),
+        'static_confidence': np.zeros(shape)        # weather + holiday confidence terms
+    }
+    for location, location_code in LOCATION_MAPPING.items():
+        tables['base'][location_code] = FALLBACK_LOCATION_BASE.get(location, FALLBACK_DEFAULT_BASE)
+        location_pattern = FALLBACK_SEASONAL_PATTERNS.get(location, FALLBACK_DEFAULT_SEASONAL)
+
+        def seasonal(month):
+            return location_pattern.get(month, FALLBACK_DEFAULT_SEASONAL[month])
+
+        for month in range(1, 13):
+            seasonal_multiplier = seasonal(month)['multiplier']
+            tables['raw_multiplier'][location_code, month] = seasonal_multiplier
+            tables['trend'][location_code, month] = FALLBACK_TRENDS.index(seasonal(month)['trend'])
+
+            # Weighted average with adjacent months for gradual changes between seasons
+            if location in FALLBACK_SMOOTHED_LOCATIONS:
+                prev_multiplier = seasonal(month - 1 if month > 1 else 12)['multiplier']
+                next_multiplier = seasonal(month + 1 if month < 12 else 1)['multiplier']
+                seasonal_multiplier = 0.3 * prev_multiplier + 0.4 * seasonal_multiplier + 0.3 * next_multiplier
+            tables['multiplier'][location_code, month] = seasonal_multiplier
+
+            # Weather impact: temperature comfort (ideal 15-25°C), sunshine, precipitation penalty
+            weather = weather_for(location, month)
             temp_comfort = max(0, 1 - abs(weather['temp_mean'] - 20) / 20)
-            # Sunshine score (more sunshine is better)
             sunshine_score = min(1, weather['sunshine'] / 300)
-            # Precipitation penalty (less rain/snow is better)
             precip_penalty = max(0, 1 - weather['precip'] / 200)
-            
             weather_multiplier = 0.7 + 0.3 * (temp_comfort + sunshine_score + precip_penalty) / 3
-            
-            # Holiday factor
+
             holidays = HOLIDAY_DATA.get(month, HOLIDAY_DATA[6])
             holiday_impact = (holidays['count'] * 0.08) + (holidays['long_weekend'] * 0.12) + (holidays['national'] * 0.05)
-            holiday_multiplier = 1.0 + holiday_impact
-            
-            # Weekend effect (month has about 4-5 weekends)
-            weekend_effect = 1.0 + (8 * 0.02)  # 8 weekends in a month effect
-            
-            # Calculate base prediction
-            base_prediction = base_visitors * growth_factor * seasonal_multiplier * weather_multiplier * holiday_multiplier * weekend_effect
-            
-            # Add realistic variance
-            variance = random.uniform(0.85, 1.15)
-            prediction = base_prediction * variance
-            
-            # Ensure reasonable bounds with higher upper limit for peak seasons
-            prediction = max(800, min(prediction, 200000))
-            
-            # Intelligent comparative analysis
-            current_date = datetime.now()
-            current_year = current_date.year
-            current_month = current_date.month
-            
-            # Determine comparison strategy based on how far in the future the prediction is
-            months_ahead = (year - current_year) * 12 + (month - current_month)
-            
-            comparative_data = {}
-            
-            if months_ahead <= 1:
-                # For current or next month, compare with actual previous month
-                prev_month = month - 1 if month > 1 else 12
-                prev_year = year if month > 1 else year - 1
-                
-                prev_month_prediction = base_visitors * (1.0 + (prev_year - 2020) * 0.08) * \
-                                       (location_pattern.get(prev_month, default_seasonal[prev_month])['multiplier']) * \
-                                       weather_multiplier * holiday_multiplier * weekend_effect
-                prev_month_prediction = max(800, min(prev_month_prediction, 65000))
-                
-                change = ((prediction - prev_month_prediction) / prev_month_prediction) * 100 if prev_month_prediction != 0 else 0
-                comparative_data = {
-                    'comparison_type': 'previous_month',
-                    'reference_period': f"{prev_month}/{prev_year}",
-                    'reference_value': int(round(prev_month_prediction)),
-                    'change': round(change, 1),
-                    'trend': 'increase' if change > 0 else 'decrease'
-                }
-            else:
-                # For future months, compare with same month last year trend
-                prev_year_same_month = base_visitors * (1.0 + (year - 1 - 2020) * 0.08) * \
-                                      (location_pattern.get(month, default_seasonal[month])['multiplier']) * \
-                                      weather_multiplier * holiday_multiplier * weekend_effect
-                prev_year_same_month = max(800, min(prev_year_same_month, 65000))
-                
-                change = ((prediction - prev_year_same_month) / prev_year_same_month) * 100 if prev_year_same_month != 0 else 0
-                comparative_data = {
-                    'comparison_type': 'same_month_last_year',
-                    'reference_period': f"{month}/{year - 1}",
-                    'reference_value': int(round(prev_year_same_month)),
-                    'change': round(change, 1),
-                    'trend': 'increase' if change > 0 else 'decrease'
-                }
-            
-            # Adjust confidence based on rolling average reliability
-            seasonal_confidence = {
-                'peak': 0.95,
-                'high': 0.90,
-                'moderate': 0.85,
-                'rising': 0.80,
-                'declining': 0.75,
-                'low': 0.70,
-                'off': 0.65
-            }
-            
-            base_confidence = seasonal_confidence.get(seasonal_trend, 0.80)
-            
-            # Adjust confidence based on rolling average input
-            if rolling_avg and 5000 <= rolling_avg <= 80000:
-                # Reasonable rolling average increases confidence
-                base_confidence = min(0.98, base_confidence * 1.1)
-            elif rolling_avg and (rolling_avg < 1000 or rolling_avg > 100000):
-                # Extreme values decrease confidence
-                base_confidence = max(0.5, base_confidence * 0.8)
-            
-            # Adjust confidence based on weather conditions
-            weather_stability = 1.0 - (abs(weather['temp_max'] - weather['temp_min']) / 30)  # More stable weather = higher confidence
+            tables['weather_multiplier'][location_code, month] = weather_multiplier
+            tables['holiday_multiplier'][location_code, month] = 1.0 + holiday_impact
+
+            # More stable weather and more holidays = higher confidence
+            weather_stability = 1.0 - (abs(weather['temp_max'] - weather['temp_min']) / 30)
             weather_confidence = 0.7 + 0.3 * weather_stability
-            
-            # Holiday confidence boost
             holiday_confidence = min(1.0, 0.8 + (holidays['count'] * 0.03))
-            
-            confidence = min(0.98, (base_confidence + weather_confidence + holiday_confidence) / 3)
-            
-            # Generate detailed insights including rolling average impact
-            insights = []
-            
-            # Rolling average insight
-            if rolling_avg and 1000 <= rolling_avg <= 100000:
-                location_baseline = location_base.get(location, 12000)
-                if rolling_avg > location_baseline * 1.3:
-                    insights.append(f"Strong recent momentum detected ({rolling_avg:,} avg visitors). Expect continued growth.")
-                elif rolling_avg < location_baseline * 0.7:
-                    insights.append(f"Recent decline in visitors ({rolling_avg:,} avg). Recovery may be gradual.")
-                else:
-                    insights.append(f"Stable recent performance ({rolling_avg:,} avg visitors) indicates predictable trends.")
-            
-            # Seasonal insight
-            if seasonal_trend == 'peak':
-                insights.append(f"{location} is experiencing peak season in {month}/{year}. Expect maximum tourist inflow.")
-            elif seasonal_trend == 'high':
-                insights.append(f"{location} is in high season. Good tourist activity expected.")
-            elif seasonal_trend == 'off':
-                insights.append(f"{location} is in off-season. Lower tourist numbers expected.")
-            
-            # Weather insight
-            if weather['temp_mean'] > 25:
-                insights.append("High temperatures may affect visitor comfort. Consider cooling facilities.")
-            elif weather['temp_mean'] < 5:
-                insights.append("Cold temperatures may limit activities. Ensure proper heating facilities.")
-            
-            if weather['precip'] > 100:
-                insights.append("High precipitation expected. May impact outdoor activities.")
-            
-            # Holiday insight
-            if holidays['count'] > 3:
-                insights.append(f"{holidays['count']} holidays this month will likely boost tourism.")
-            elif holidays['count'] == 0:
-                insights.append("No major holidays this month may result in lower tourist numbers.")
-            
-            # Growth insight based on comparison type
-            if comparative_data['change'] > 15:
-                if comparative_data['comparison_type'] == 'previous_month':
-                    insights.append(f"Strong {comparative_data['change']:.1f}% month-over-month growth indicates increasing popularity.")
-                else:
-                    insights.append(f"Strong {comparative_data['change']:.1f}% year-over-year growth for {month}/{year}.")
-            elif comparative_data['change'] < -15:
-                insights.append(f"Significant {abs(comparative_data['change']):.1f}% decline suggests decreasing interest.")
-            
-            # Resource requirements estimation
-            resource_requirements = {
-                'staff': max(5, int(prediction / 1000)),  # 1 staff per 1000 visitors
-                'vehicles': max(2, int(prediction / 2000)),  # 1 vehicle per 2000 visitors
-                'rooms': max(20, int(prediction * 0.05))  # 0.05 rooms per visitor
-            }
-            
-            # Suggestions based on prediction
-            suggestions = []
-            if prediction > 50000:
-                suggestions.append("Coordinate with local authorities for traffic management.")
-                suggestions.append("Ensure adequate waste management and sanitation facilities.")
-            elif prediction > 20000:
-                suggestions.append("Maintain standard staffing levels with on-call support.")
-            else:
-                suggestions.append("Opportunity for targeted promotional campaigns.")
-            
-            # Weather-based suggestions
-            if weather['temp_mean'] < 0:
-                suggestions.append("Ensure snow clearing equipment is ready for visitor pathways.")
-            elif weather['precip'] > 100:
-                suggestions.append("Have contingency plans for weather-related activity disruptions.")
-            
-            # Holiday-based suggestions
-            if holidays['count'] > 2:
-                suggestions.append("Increase security and crowd management personnel during holiday periods.")
-            
-            response = {
-                'success': True,
-                'prediction': {
-                    'location': location,
-                    'year': year,
-                    'month': month,
-                    'predicted_footfall': int(round(prediction)),
-                    'confidence': round(confidence, 2),
-                    'comparative_analysis': comparative_data,
-                    'weather': {
-                        'temperature_mean': weather['temp_mean'],
-                        'temperature_max': weather['temp_max'],
-                        'temperature_min': weather['temp_min'],
-                        'precipitation': weather['precip'],
-                        'snowfall': weather['snow'],
-                        'sunshine_hours': weather['sunshine'],
-                        'wind_speed': weather['wind']
-                    },
-                    'holidays': {
-                        'count': holidays['count'],
-                        'long_weekends': holidays['long_weekend'],
-                        'national_holidays': holidays['national'],
-                        'festival_holidays': holidays['festival']
-                    },
-                    'insights': insights,
-                    'resource_suggestions': suggestions,
-                    'resourceRequirements': resource_requirements
-                },
-                'timestamp': datetime.now().isoformat(),
-                'model_used': False
-            }
-            
-            logger.info(f"Fallback Prediction: {location} {year}-{month:02d} → {int(round(prediction)):,} visitors (Confidence: {confidence:.2f})")
-            
-            return jsonify(response)
-    except Exception as e:
-        logger.error(f"Prediction error: {str(e)}")
-        return jsonify({'error': 'Prediction failed', 'details': str(e)}), 500
+            tables['static_confidence'][location_code, month] = weather_confidence + holiday_confidence
+
+    for table in tables.values():
+        table.setflags(write=False)
+    return tables
+
+FALLBACK_TABLES = compile_fallback_tables()
+FALLBACK_TREND_CONFIDENCE_VALUES = np.array([FALLBACK_TREND_CONFIDENCE[trend] for trend in FALLBACK_TRENDS])
+
+def fallback_variance(location_codes, years, months, rolling_avgs, seed=None):
+    """
+    Variance multipliers in [0.85, 1.15). Without a seed they are random; with a seed each
+    is a splitmix64 hash of (seed, location, year, month, rolling_avg), i.e. reproducible
+    """
+    if seed is None:
+        return np.random.default_rng().uniform(0.85, 1.15, len(location_codes))
+    with np.errstate(over='ignore'):
+        key = (np.uint64(seed & 0xFFFFFFFFFFFFFFFF)
+               ^ (np.asarray(location_codes).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15))
+               ^ (np.asarray(years).astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F))
+               ^ (np.asarray(months).astype(np.uint64) * np.uint64(0x165667B19E3779F9))
+               ^ np.asarray(rolling_avgs, dtype=np.float64).view(np.uint64))
+        key ^= key >> np.uint64(30)
+        key *= np.uint64(0xBF58476D1CE4E5B9)
+        key ^= key >> np.uint64(27)
+        key *= np.uint64(0x94D049BB133111EB)
+        key ^= key >> np.uint64(31)
+    unit = (key >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+    return 0.85 + 0.3 * unit
+
+def heuristic_confidence(location_codes, months, rolling_avgs):
+    """
+    Confidence from the seasonal trend, the rolling average input, weather and holidays
+    (missing/zero rolling averages are ignored); used where no model interval exists
+    """
+    tables = FALLBACK_TABLES
+    rolling_avgs = np.array([value or 0 for value in rolling_avgs], dtype=float)
+    has_avg = rolling_avgs != 0
+    base_confidence = FALLBACK_TREND_CONFIDENCE_VALUES[tables['trend'][location_codes, months]]
+    reasonable_avg = has_avg & (rolling_avgs >= 5000) & (rolling_avgs <= 80000)
+    extreme_avg = has_avg & ((rolling_avgs < 1000) | (rolling_avgs > 100000))
+    base_confidence = np.where(reasonable_avg, np.minimum(0.98, base_confidence * 1.1),
+                               np.where(extreme_avg, np.maximum(0.5, base_confidence * 0.8), base_confidence))
+    return np.minimum(0.98, (base_confidence + tables['static_confidence'][location_codes, months]) / 3)
+
+def fallback_predict_batch(locations, years, months, rolling_avgs, now=None, seed=FALLBACK_SEED):
+    """
+    Fallback predictions for a batch of rows, with the comparison against the previous
+    month (for the current/next month) or the same month last year (further ahead).
+    Returns a dict of arrays: prediction, confidence, trend, comparison_previous_month,
+    reference_year, reference_month, reference_value and change.
+    """
+    now = now or datetime.now()
+    tables = FALLBACK_TABLES
+    codes = location_codes_for(locations)
+    years = np.asarray(years, dtype=np.int64)
+    months = np.asarray(months, dtype=np.intp)
+    # Missing/zero rolling averages disable every rolling-average adjustment
+    rolling_avgs = np.array([value or 0 for value in rolling_avgs], dtype=float)
+    has_avg = rolling_avgs != 0
+
+    # Use 40% of the rolling average as baseline if provided and reasonable
+    location_baseline = tables['base'][codes]
+    usable_avg = has_avg & (rolling_avgs >= 1000) & (rolling_avgs <= 100000)
+    base_visitors = np.where(usable_avg, rolling_avgs * 0.4, location_baseline)
+
+    # 8% annual growth, nudged by recent momentum relative to the location baseline
+    growth_factor = 1.0 + (years - 2020) * 0.08
+    growth_factor = growth_factor * np.where(has_avg & (rolling_avgs > location_baseline * 1.2), 1.05,
+                                             np.where(has_avg & (rolling_avgs < location_baseline * 0.8), 0.95, 1.0))
+
+    weather_multiplier = tables['weather_multiplier'][codes, months]
+    holiday_multiplier = tables['holiday_multiplier'][codes, months]
+    base_prediction = (base_visitors * growth_factor * tables['multiplier'][codes, months]
+                       * weather_multiplier * holiday_multiplier * FALLBACK_WEEKEND_EFFECT)
+    variance = fallback_variance(codes, years, months, rolling_avgs, seed)
+    predictions = np.clip(base_prediction * variance, 800, 200000)
+
+    # Compare with the previous month for the current/next month, else the same month last year
+    months_ahead = (years - now.year) * 12 + (months - now.month)
+    previous_month = months_ahead <= 1
+    prev_years, prev_months = previous_month_of(years, months)
+    reference_years = np.where(previous_month, prev_years, years - 1)
+    reference_months = np.where(previous_month, prev_months, months)
+    reference_values = np.clip(
+        base_visitors * (1.0 + (reference_years - 2020) * 0.08)
+        * tables['raw_multiplier'][codes, reference_months]
+        * weather_multiplier * holiday_multiplier * FALLBACK_WEEKEND_EFFECT,
+        800, 65000
+    )
+    change = (predictions - reference_values) / reference_values * 100
+
+    return {
+        'prediction': predictions,
+        'confidence': heuristic_confidence(codes, months, rolling_avgs),
+        'trend': tables['trend'][codes, months],
+        'comparison_previous_month': previous_month,
+        'reference_year': reference_years,
+        'reference_month': reference_months,
+        'reference_value': reference_values,
+        'change': change
+    }
+
+def run_model_sanity_suite(bundle, year, rolling_avg=80000):
+    """
+    Score every location x month for one year in a single batch and flag months
+    where predictions across locations are suspiciously similar
+    """
+    locations = list(LOCATION_MAPPING.keys())
+    months = list(range(1, 13))
+    grid_locations = [location for location in locations for _ in months]
+    grid_months = months * len(locations)
+
+    values = predict_batch_values(bundle, grid_locations, [year] * len(grid_months), grid_months,
+                                  [rolling_avg] * len(grid_months)).reshape(len(locations), len(months))
+
+    month_ranges = np.ptp(values, axis=0)
+    suspicious_months = [month for month, value_range in zip(months, month_ranges)
+                         if value_range < SANITY_MIN_LOCATION_RANGE]
+    non_finite = int(np.count_nonzero(~np.isfinite(values)))
+
+    issues = []
+    if suspicious_months:
+        issues.append(f"Suspiciously similar predictions across locations for months {suspicious_months}")
+    if non_finite:
+        issues.append(f"{non_finite} non-finite predictions")
+
+    return {
+        'healthy': not issues,
+        'issues': issues,
+        'year': year,
+        'rolling_avg': rolling_avg,
+        'locations_checked': len(locations),
+        'month_ranges': {month: round(float(value_range), 1) for month, value_range in zip(months, month_ranges)},
+        'suspicious_months': suspicious_months,
+        'checked_at': datetime.now().isoformat()
+    }
+
+def build_tree_engine(bundle):
+    """
+    Export the model's trees to flat arrays and check them against model.predict
+    on every location x month for a few years and rolling averages
+    Returns None (keep using model.predict, without prediction intervals) if the model
+    is unsupported or differs
+    """
+    locations = list(LOCATION_MAPPING.keys())
+    check_rows = [
+        (location, year, month, rolling_avg)
+        for location in locations
+        for year in (2020, datetime.now().year, datetime.now().year + 5)
+        for month in range(1, 13)
+        for rolling_avg in (5000, 80000, 250000)
+    ]
+    check_features = scale_features_batch(bundle, *zip(*check_rows))
+
+    engine, difference = export_model(bundle.model, check_features, tolerance=TREE_ENGINE_TOLERANCE)
+    if engine is None:
+        if difference is None:
+            logger.warning(f"Flat tree engine does not support {type(bundle.model).__name__}; using model.predict")
+        else:
+            logger.warning(f"Flat tree engine differs from model.predict by {difference:.3g}; using model.predict")
+        return None
+
+    logger.info(f"✓ Flat tree engine ready: {engine.n_trees} trees, {engine.n_nodes} nodes, max difference {difference:.3g}")
+    return engine
+
+# Rolling average used for the baseline forecast in the /api/locations catalog
+CATALOG_BASELINE_ROLLING_AVG = 80000
+# Seconds browsers and proxies may reuse the catalog without revalidating
+LOCATIONS_CACHE_MAX_AGE = int(os.environ.get('LOCATIONS_CACHE_MAX_AGE', '3600'))
+
+def build_locations_catalog(bundle=None, year=None):
+    """
+    Render the /api/locations payload: every location with its code, its 12-month
+    weather/holiday feature profile and, when a model is given, a 12-month baseline
+    forecast for year. Returns (JSON bytes, strong ETag of those bytes).
+    """
+    year = year or datetime.now().year
+    locations = list(LOCATION_MAPPING.keys())
+    months = list(range(1, 13))
+    profile_columns = [column for column in range(NUM_FEATURES)
+                       if column not in DYNAMIC_COLUMNS and FEATURE_NAMES[column] not in ('location_encoded', 'month')]
+
+    baseline = None
+    if bundle is not None:
+        values = predict_footfall_values(bundle, [location for location in locations for _ in months],
+                                         [year] * len(locations) * 12, months * len(locations),
+                                         [CATALOG_BASELINE_ROLLING_AVG] * len(locations) * 12)
+        baseline = np.round(np.maximum(0, values)).astype(int).reshape(len(locations), 12)
+
+    catalog = []
+    for index, location in enumerate(locations):
+        location_code = LOCATION_MAPPING[location]
+        profile = []
+        for month in months:
+            row = FEATURE_TABLE[location_code, month]
+            entry = {'month': month}
+            for column in profile_columns:
+                value = float(row[column])
+                entry[FEATURE_NAMES[column]] = int(value) if value.is_integer() else value
+            profile.append(entry)
+
+        baseline_forecast = None
+        if baseline is not None:
+            monthly = baseline[index].tolist()
+            baseline_forecast = {
+                'year': year,
+                'rolling_avg': CATALOG_BASELINE_ROLLING_AVG,
+                'monthly': monthly,
+                'annual_total': sum(monthly),
+                'peak_month': int(np.argmax(monthly)) + 1
+            }
+        catalog.append({'name': location, 'code': location_code, 'profile': profile,
+                        'baseline_forecast': baseline_forecast})
+
+    body = dumps({
+        'success': True,
+        'locations': locations,
+        'catalog': catalog,
+        'baseline_year': year,
+        'model_used': bundle is not None,
+        'model_version': bundle.version if bundle is not None else None
+    })
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+def prepare_bundle(bundle):
+    """
+    Derived artifacts computed once per model load, before the bundle goes live
+    The predictions made here (sanity suite, catalog, warm-up) are kept out of the request metrics
+    """
+    with metrics.discarding():
+        return compute_bundle_artifacts(bundle)
+
+def compute_bundle_artifacts(bundle):
+    """Artifacts for prepare_bundle"""
+    if MODEL_N_JOBS and hasattr(bundle.model, 'n_jobs'):
+        bundle.model.n_jobs = int(MODEL_N_JOBS)
+    artifacts = {'scaled_feature_table': compile_scaled_feature_table(bundle.scaler)}
+    tree_engine = build_tree_engine(replace(bundle, artifacts=artifacts))
+    if INFERENCE_BACKEND == 'flat':
+        artifacts['tree_engine'] = tree_engine
+    if tree_engine is not None and tree_engine.aggregate == 'mean' and tree_engine.n_trees > 1:
+        # Averaging ensembles (random forests): the spread of the trees gives prediction intervals.
+        # The exported trees are used for them with either inference backend.
+        artifacts['interval_engine'] = tree_engine
+    sanity = run_model_sanity_suite(replace(bundle, artifacts=artifacts), datetime.now().year)
+    if not sanity['healthy']:
+        for issue in sanity['issues']:
+            logger.warning(f"Model sanity check failed for bundle {bundle.version}: {issue}. This may indicate model quality issues.")
+    artifacts['sanity'] = sanity
+    catalog_year = datetime.now().year
+    artifacts['locations_catalog'] = (catalog_year, *build_locations_catalog(replace(bundle, artifacts=artifacts),
+                                                                             catalog_year))
+    # Last, so the bundle only goes live (and reports ready) once warm
+    artifacts['warmup'] = run_warmup(replace(bundle, artifacts=artifacts), MODEL_WARMUP_PASSES)
+    return artifacts
+
+# Sanity results for other years, memoized per (model version, year)
+sanity_cache = {}
+sanity_lock = threading.Lock()
+MAX_SANITY_ENTRIES = 64
+
+def clear_sanity_cache(bundle=None):
+    """Drop memoized sanity results (called whenever a new model bundle goes live)"""
+    with sanity_lock:
+        sanity_cache.clear()
+
+def get_model_sanity(bundle, year=None):
+    """Return sanity results for a year, computing them at most once per model version"""
+    if year is None or year == bundle.artifacts['sanity']['year']:
+        return bundle.artifacts['sanity']
+    key = (bundle.version, year)
+    with sanity_lock:
+        sanity = sanity_cache.get(key)
+    if sanity is None:
+        # Computed outside the lock; concurrent misses for the same key just repeat the suite
+        sanity = run_model_sanity_suite(bundle, year)
+        with sanity_lock:
+            if len(sanity_cache) >= MAX_SANITY_ENTRIES:
+                sanity_cache.clear()
+            sanity_cache[key] = sanity
+    return sanity
+
+# Largest year range served by /api/forecast/grid in one call
+MAX_GRID_YEARS = 20
+
+# Post-processed location x month forecasts, memoized per (model version, year, rolling_avg, intervals)
+forecast_grid_cache = {}
+forecast_grid_lock = threading.Lock()
+MAX_FORECAST_GRID_ENTRIES = 256
+
+def clear_forecast_grid_cache(bundle=None):
+    """Drop memoized grids (called whenever a new model bundle goes live)"""
+    with forecast_grid_lock:
+        forecast_grid_cache.clear()
+
+def compute_forecast_grid(bundle, years, rolling_avg=80000, intervals=False):
+    """
+    Return {year: locations x 12 array of predicted footfall}, scoring every
+    year not already memoized for this model version in one batched inference
+    With intervals=True each year is a 4 x locations x 12 array instead:
+    the predictions followed by their P10, P50 and P90 grids
+    """
+    locations = list(LOCATION_MAPPING.keys())
+    months = list(range(1, 13))
+    with forecast_grid_lock:
+        grids = {year: forecast_grid_cache.get((bundle.version, year, rolling_avg, intervals)) for year in years}
+    missing_years = [year for year, grid in grids.items() if grid is None]
+
+    if missing_years:
+        cells = len(locations) * len(months)
+        grid_locations = [location for location in locations for _ in months] * len(missing_years)
+        grid_months = months * len(locations) * len(missing_years)
+        grid_years = [year for year in missing_years for _ in range(cells)]
+
+        values = predict_footfall_values(bundle, grid_locations, grid_years, grid_months,
+                                         [rolling_avg] * len(grid_months), intervals=intervals)
+        if intervals:
+            values = np.column_stack([values[0], values[1]]).T
+        predictions = np.round(np.maximum(0, values)).astype(int)
+        if intervals:
+            predictions = predictions.reshape(-1, len(missing_years), len(locations), len(months)).swapaxes(0, 1)
+        else:
+            predictions = predictions.reshape(len(missing_years), len(locations), len(months))
+
+        with forecast_grid_lock:
+            if len(forecast_grid_cache) + len(missing_years) > MAX_FORECAST_GRID_ENTRIES:
+                forecast_grid_cache.clear()
+            for year, grid in zip(missing_years, predictions):
+                grid.setflags(write=False)
+                forecast_grid_cache[(bundle.version, year, rolling_avg, intervals)] = grid
+                grids[year] = grid
+
+    return grids
+
+# Rows scored per inference batch by /api/forecast/stream; bounds memory regardless of horizon
+FORECAST_STREAM_BATCH_ROWS = int(os.environ.get('FORECAST_STREAM_BATCH_ROWS', '120'))
+MAX_STREAM_YEARS = 100
+
+def generate_forecast_stream(bundle, locations, year_start, year_end, rolling_avg,
+                             batch_rows=FORECAST_STREAM_BATCH_ROWS):
+    """
+    Yield newline-delimited JSON predictions for every year x location x month,
+    scoring batch_rows rows at a time. Only the current batch is held in memory and
+    closing the generator (client disconnect) stops any further scoring.
+    """
+    rows_per_year = len(locations) * 12
+    total = (year_end - year_start + 1) * rows_per_year
+    location_names = np.array(locations, dtype=object)
+    sent = 0
+    try:
+        for start in range(0, total, batch_rows):
+            index = np.arange(start, min(start + batch_rows, total))
+            years = year_start + index // rows_per_year
+            batch_locations = location_names[(index // 12) % len(locations)].tolist()
+            months = index % 12 + 1
+
+            values = predict_footfall_values(bundle, batch_locations, years, months, [rolling_avg] * len(index))
+            predictions = np.round(np.maximum(0, values)).astype(int)
+
+            yield b''.join(
+                dumps({'location': location, 'year': year, 'month': month, 'predicted_footfall': prediction}) + b'\n'
+                for location, year, month, prediction
+                in zip(batch_locations, years.tolist(), months.tolist(), predictions.tolist())
+            )
+            sent += len(index)
+        metrics.inc('forecast_streams_total', outcome='completed')
+    except GeneratorExit:
+        metrics.inc('forecast_streams_total', outcome='cancelled')
+        logger.info(f"Forecast stream cancelled by client after {sent} of {total} rows")
+        raise
+    except Exception as e:
+        metrics.inc('forecast_streams_total', outcome='error')
+        logger.error(f"Forecast stream error after {sent} of {total} rows: {str(e)}")
+        yield dumps({'error': 'Forecast stream failed', 'details': str(e)}) + b'\n'
+
+# Features a what-if sweep may override; the interaction terms are recomputed from them
+SWEEP_FEATURES = {
+    'rolling_avg': ROLLING_AVG_COLUMN,
+    **{name: FEATURE_NAMES.index(name) for name in (
+        'temperature_2m_mean', 'temperature_2m_max', 'temperature_2m_min', 'precipitation_sum',
+        'sunshine_duration', 'holiday_count', 'long_weekend_count', 'national_holiday_count',
+        'festival_holiday_count'
+    )}
+}
+# Largest number of scenarios (product of all override list lengths) in one sweep
+MAX_SWEEP_SCENARIOS = 2000
+
+def validate_sweep_overrides(overrides):
+    """Return an error message for invalid sweep overrides ({feature: [values]}), or None if they are valid"""
+    if not isinstance(overrides, dict) or not overrides:
+        return 'Missing required field: overrides (object of feature -> list of values)'
+    scenarios = 1
+    for feature, values in overrides.items():
+        if feature not in SWEEP_FEATURES:
+            if feature in ('snow', 'snowfall', 'snowfall_sum'):
+                return f"Cannot override {feature}: snowfall is not a model feature"
+            return f"Cannot override {feature}. Overridable features: {', '.join(SWEEP_FEATURES)}"
+        if not isinstance(values, list) or not values:
+            return f'Override {feature}: expected a non-empty list of numbers'
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+                   for value in values):
+            return f'Override {feature}: values must be numbers'
+        scenarios *= len(values)
+    if scenarios > MAX_SWEEP_SCENARIOS:
+        return f'Too many scenarios: {scenarios} (maximum {MAX_SWEEP_SCENARIOS})'
+    return None
+
+def rescale_columns(bundle, scaled_features, raw_features, columns):
+    """
+    Overwrite columns of a scaled feature matrix, in place, from the raw matrix they were
+    changed in, scaling only those columns (whole rows for scalers that are not per-column affine)
+    """
+    scaled = bundle.artifacts.get('scaled_feature_table')
+    if scaled is None:
+        scaled_features[:] = bundle.scaler.transform(raw_features)
+        return
+    _, mean, scale = scaled
+    scaled_features[:, columns] = (raw_features[:, columns] - mean[columns]) / scale[columns]
+
+def run_sweep(bundle, location, year, month, rolling_avg, overrides):
+    """
+    Score one location/month under every combination of overrides ({feature: [values]}),
+    plus the unmodified base scenario, in a single batched inference. Post-processing
+    matches predict_footfall_values: each scenario is smoothed against the previous month
+    (with the same rolling_avg), then seasonal adjustments apply.
+    Returns (base prediction, base value of each dimension, dimensions,
+    N x dimensions override values, N predictions) with scenarios in row-major order
+    of the override lists.
+    """
+    dimensions = list(overrides)
+    grids = np.meshgrid(*[np.asarray(overrides[dimension], dtype=float) for dimension in dimensions],
+                        indexing='ij')
+    scenario_values = np.column_stack([grid.ravel() for grid in grids])
+    count = len(scenario_values) + 1  # Base scenario first
+    columns = [SWEEP_FEATURES[dimension] for dimension in dimensions]
+
+    with metrics.timer('stage_latency_seconds', stage='features', path='sweep'):
+        # Base rows (this month, then the previous month) come from the same scaled gather as /api/predict
+        previous_years, previous_months = previous_month_of([year], [month])
+        base_rows = ([location] * 2, [year, previous_years[0]], [month, previous_months[0]], [rolling_avg] * 2)
+        raw_base = prepare_features_batch(*base_rows)
+        scaled_features = np.repeat(scale_features_batch(bundle, *base_rows), count, axis=0)
+
+        # Only the overridden columns (and the interaction terms derived from them) are rescaled
+        scenarios = np.repeat(raw_base[:1], count - 1, axis=0)
+        scenarios[:, columns] = scenario_values
+        apply_interaction_features(scenarios)
+        rescale_columns(bundle, scaled_features[1:count], scenarios, sorted(set(columns) | set(INTERACTION_COLUMNS)))
+        if 'rolling_avg' in overrides:
+            # Recent footfall applies to the previous month too; weather and holidays do not
+            previous = np.repeat(raw_base[1:], count - 1, axis=0)
+            previous[:, ROLLING_AVG_COLUMN] = scenario_values[:, dimensions.index('rolling_avg')]
+            rescale_columns(bundle, scaled_features[count + 1:], previous, [ROLLING_AVG_COLUMN])
+
+    with metrics.timer('stage_latency_seconds', stage='inference', path='sweep'):
+        values = predict_scaled_values(bundle, scaled_features)
+    smoothed = smooth_transitions(values[:count], values[count:])
+    adjusted = apply_seasonal_adjustments(smoothed, [location] * count, [month] * count)
+    predictions = np.round(np.maximum(0, adjusted)).astype(int)
+    return int(predictions[0]), raw_base[0, columns], dimensions, scenario_values, predictions[1:]
+
+def sweep_value(value):
+    """A sweep feature value for JSON: int when it is a whole number"""
+    return int(value) if value.is_integer() else value
+
+# Served by /api/locations while no model is loaded
+NO_MODEL_LOCATIONS_CATALOG = (datetime.now().year, *build_locations_catalog(year=datetime.now().year))
+
+# Catalogs for years after the one a bundle was loaded in, per (model version, year)
+locations_catalog_cache = {}
+locations_catalog_lock = threading.Lock()
+
+def get_locations_catalog(bundle):
+    """
+    (JSON bytes, ETag) of the /api/locations payload with the current year's baseline,
+    rendered at most once per model version and year (None: no model loaded)
+    """
+    year = datetime.now().year
+    rendered = bundle.artifacts['locations_catalog'] if bundle is not None else NO_MODEL_LOCATIONS_CATALOG
+    catalog_year, body, etag = rendered
+    if catalog_year == year:
+        return body, etag
+    key = (bundle.version if bundle is not None else None, year)
+    with locations_catalog_lock:
+        if key not in locations_catalog_cache:
+            if len(locations_catalog_cache) >= 16:
+                locations_catalog_cache.clear()
+            locations_catalog_cache[key] = build_locations_catalog(bundle, year)
+        return locations_catalog_cache[key]
+
+# Cache of model outputs keyed by (model version, location, year, month, rolling_avg)
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', '4096')),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', '0'))
+)
+
+# Model, scaler and metadata are held together as one immutable bundle
+registry = ModelRegistry(MODEL_PATH, SCALER_PATH, METADATA_PATH, prepare=prepare_bundle,
+                         poll_interval=MODEL_WATCH_INTERVAL, mmap_mode=MODEL_MMAP_MODE)
+
+registry.add_listener(clear_forecast_grid_cache)
+registry.add_listener(clear_sanity_cache)
+registry.add_listener(prediction_cache.clear)
+
+# Candidate bundle for shadow scoring / A/B tests, prepared (and hot-reloaded) like the primary
+candidate_registry = ModelRegistry(
+    CANDIDATE_MODEL_PATH, CANDIDATE_SCALER_PATH, CANDIDATE_METADATA_PATH, prepare=prepare_bundle,
+    poll_interval=MODEL_WATCH_INTERVAL, mmap_mode=MODEL_MMAP_MODE
+) if CANDIDATE_MODEL_PATH else None
+
+def score_shadow(bundle, rows, scaled_features=None):
+    """Rounded post-processed predictions of bundle for (locations, years, months, rolling_avgs)"""
+    values = predict_footfall_values(bundle, *rows, scaled_features=scaled_features)
+    return np.round(np.maximum(0, values)).astype(int)
+
+shadow_scorer = ShadowScorer(
+    score_shadow, SHADOW_LOG_PATH, workers=SHADOW_WORKERS, max_pending=SHADOW_MAX_PENDING
+) if candidate_registry is not None else None
+
+def shares_feature_scaling(bundle, other):
+    """True if both bundles scale features identically, so one scaled matrix serves both"""
+    scaled, other_scaled = bundle.artifacts.get('scaled_feature_table'), other.artifacts.get('scaled_feature_table')
+    return (scaled is not None and other_scaled is not None
+            and np.array_equal(scaled[1], other_scaled[1]) and np.array_equal(scaled[2], other_scaled[2]))
+
+def serves_candidate(location, year, month, rolling_avg):
+    """
+    True for the CANDIDATE_TRAFFIC_PERCENT share of inputs routed to the candidate.
+    Hash-based rather than random, so a given input always gets the same model
+    (and the prediction cache and ETags stay valid).
+    """
+    if CANDIDATE_TRAFFIC_PERCENT <= 0:
+        return False
+    key = f"{location}|{year}|{month}|{rolling_avg!r}".encode('utf-8')
+    bucket = int.from_bytes(hashlib.sha256(key).digest()[:8], 'big') % 10000
+    return bucket < CANDIDATE_TRAFFIC_PERCENT * 100
+
+def select_bundle(location, year, month, rolling_avg):
+    """
+    (bundle serving this prediction, 'primary' or 'candidate', the other bundle to shadow-score)
+    The bundle is None if no primary model is loaded; the other bundle is None without a candidate.
+    """
+    bundle = registry.current()
+    candidate = candidate_registry.current() if candidate_registry is not None else None
+    if bundle is None or candidate is None:
+        return bundle, 'primary', None
+    if serves_candidate(location, year, month, rolling_avg):
+        return candidate, 'candidate', bundle
+    return bundle, 'primary', candidate
+
+def shadow_after_response(response, endpoint, bundle, variant, other, rows, served_values, served_ms=None,
+                          scaled_features=None):
+    """Score rows with the other bundle once the response has been sent (off the request path)"""
+    if shadow_scorer is None or other is None:
+        return response
+    if scaled_features is not None and not shares_feature_scaling(bundle, other):
+        scaled_features = None
+    response.call_on_close(lambda: shadow_scorer.submit(endpoint, bundle, variant, other, rows, served_values,
+                                                        served_ms=served_ms, scaled_features=scaled_features))
+    return response
+
+def load_model():
+    """Load model, scaler, and metadata with proper error handling"""
+    return registry.reload(force=True)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count every request and record its latency (cheap enough to leave on in production)"""
+    started = g.get('request_started')
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    if started is not None:
+        metrics.observe('request_latency_seconds', time.perf_counter() - started, endpoint=endpoint)
+    metrics.inc('requests_total', endpoint=endpoint, method=request.method,
+                status=str(response.status_code), path=g.get('prediction_path', 'none'))
+    if response.status_code >= 500:
+        metrics.inc('errors_total', endpoint=endpoint)
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text format metrics: stage/request latency histograms, counts, cache hit rates"""
+    bundle = registry.current()
+    cache = prediction_cache.stats()
+    gauges = [
+        ('model_loaded', int(bundle is not None), {}),
+        ('prediction_cache_size', cache['size'], {}),
+        ('prediction_cache_hit_ratio', cache['hit_rate'], {}),
+        ('prediction_cache_evictions', cache['evictions'], {}),
+    ]
+    if micro_batcher is not None:
+        batching = micro_batcher.stats()
+        gauges += [
+            ('micro_batch_batches', batching['batches'], {}),
+            ('micro_batch_requests', batching['requests'], {}),
+            ('micro_batch_rejected', batching['rejected'], {}),
+            ('micro_batch_queue_size', batching['queue_size'], {}),
+        ]
+    if audit_log.enabled:
+        audit = audit_log.stats()
+        gauges += [
+            ('audit_log_queue_size', audit['queue_size'], {}),
+            ('audit_log_dropped', audit['dropped'], {}),
+            ('audit_log_written', audit['written'], {}),
+        ]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving requests (model not required)"""
+    return jsonify({'status': 'alive', 'timestamp': datetime.now().isoformat()})
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once a model bundle is loaded, 503 while loading or after a failed load"""
+    status = registry.status()
+    status['ready'] = status['state'] == 'ready'
+    bundle = registry.current()
+    status['warmup'] = bundle.artifacts.get('warmup') if bundle is not None else None
+    status['timestamp'] = datetime.now().isoformat()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Health check endpoint (reports the model load state; never triggers a load)"""
+    bundle = registry.current()
+    sanity = bundle.artifacts['sanity'] if bundle is not None else None
+    model_healthy = sanity is not None and sanity['healthy']
+    
+    return jsonify({
+        'status': 'healthy' if bundle is None or model_healthy else 'degraded',
+        'model_loaded': bundle is not None,
+        'model_state': registry.state,
+        'model_healthy': model_healthy,
+        'model_issues': sanity['issues'] if sanity is not None else [],
+        'model_version': bundle.version if bundle is not None else None,
+        'warmup': bundle.artifacts.get('warmup') if bundle is not None else None,
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/locations', methods=['GET'])
+def locations_catalog():
+    """
+    All locations with their codes, 12-month feature profiles and baseline forecasts
+    Rendered once per model load and baseline year; served with Cache-Control and a strong ETag
+    (the body, and so the ETag, includes the baseline year)
+    """
+    bundle = registry.current()
+    body, etag = get_locations_catalog(bundle)
+    if bundle is not None:
+        cache_control = f'public, max-age={LOCATIONS_CACHE_MAX_AGE}'
+    else:
+        # Profiles only; revalidate every time so clients pick up the baseline once a model loads
+        cache_control = 'no-cache'
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers={'Cache-Control': cache_control})
+    else:
+        response = json_response(body, headers={'Cache-Control': cache_control})
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/model/status', methods=['GET'])
+def model_status():
+    """Model sanity suite results (all locations x months), optionally for ?year=YYYY"""
+    bundle = registry.current()
+    if bundle is None:
+        return jsonify({'model_loaded': False, 'error': 'Model not loaded'}), 503
+
+    year = request.args.get('year')
+    if year is not None:
+        # Each distinct year runs (and memoizes) the full sanity suite, so only plausible years are accepted
+        year = parse_number(year, default=None)
+        if not is_whole_number(year) or not (MIN_PREDICTION_YEAR <= year <= MAX_PREDICTION_YEAR):
+            return jsonify({'error': f'Year must be a whole number between {MIN_PREDICTION_YEAR} '
+                                     f'and {MAX_PREDICTION_YEAR}'}), 400
+        year = int(year)
+    return jsonify({
+        'model_loaded': True,
+        'model_version': bundle.version,
+        'model_type': bundle.model_type,
+        'loaded_at': bundle.loaded_at,
+        'target_transform': bundle.target_transform,
+        'inference_backend': 'flat' if bundle.artifacts.get('tree_engine') is not None else 'sklearn',
+        'json_backend': JSON_BACKEND,
+        'prediction_intervals': bundle.artifacts.get('interval_engine') is not None,
+        'weather_store': weather_store.info() if weather_store is not None else None,
+        'sanity': get_model_sanity(bundle, year)
+    })
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Prediction cache size and hit/miss counters"""
+    bundle = registry.current()
+    return jsonify({
+        'prediction_cache': prediction_cache.stats(),
+        'model_version': bundle.version if bundle is not None else None
+    })
+
+def compile_static_fragments():
+    """
+    Pre-build the static 'weather' and 'holidays' members of a prediction payload for
+    every location x month, both as dicts and as pre-rendered JSON bytes
+    """
+    fragments = {}
+    for location in LOCATION_MAPPING:
+        for month in range(1, 13):
+            weather = weather_for(location, month)
+            holidays = HOLIDAY_DATA.get(month, HOLIDAY_DATA[6])
+            members = {
+                'weather': {
+                    'temperature_mean': weather['temp_mean'],
+                    'temperature_max': weather['temp_max'],
+                    'temperature_min': weather['temp_min'],
+                    'precipitation': weather['precip'],
+                    'snowfall': weather['snow'],
+                    'sunshine_hours': weather['sunshine'],
+                    'wind_speed': weather['wind']
+                },
+                'holidays': {
+                    'count': holidays['count'],
+                    'long_weekends': holidays['long_weekend'],
+                    'national_holidays': holidays['national'],
+                    'festival_holidays': holidays['festival']
+                }
+            }
+            fragments[(location, month)] = (members, {name: dumps(value) for name, value in members.items()})
+    return fragments
+
+STATIC_PREDICTION_FRAGMENTS = compile_static_fragments()
+
+# 'weather' payload members for the WEATHER_STORE_COLUMNS
+WEATHER_PAYLOAD_KEYS = ['temperature_mean', 'temperature_max', 'temperature_min', 'precipitation', 'sunshine_hours']
+
+def prediction_weather(location, year, month):
+    """
+    ('weather' payload member, weather source) for one location/month: the static
+    climatology member, with the weather store's values for that year where it has them
+    """
+    static_members, _ = STATIC_PREDICTION_FRAGMENTS[(location, month)]
+    stored = stored_weather(location_codes_for([location]), [year], [month])[0]
+    if np.isnan(stored).all():
+        return static_members['weather'], 'climatology'
+    weather = dict(static_members['weather'])
+    for key, value in zip(WEATHER_PAYLOAD_KEYS, stored.tolist()):
+        if not np.isnan(value):
+            weather[key] = round(value, 1)
+    return weather, 'weather_store'
+
+def render_prediction(prediction_data):
+    """JSON bytes of a prediction payload, splicing in its pre-rendered weather/holidays"""
+    members, rendered = STATIC_PREDICTION_FRAGMENTS[(prediction_data['location'], prediction_data['month'])]
+    # Year-specific weather replaces the static member, so only splice members that are still static
+    rendered = {name: fragment for name, fragment in rendered.items() if prediction_data.get(name) is members[name]}
+    dynamic = {key: value for key, value in prediction_data.items() if key not in rendered}
+    return splice(dumps(dynamic), rendered)
+
+def build_model_prediction(bundle, location, year, month, rolling_avg, trace=None, intervals=False, coalesce=True):
+    """
+    Build the 'prediction' payload for one location/month using the trained model
+    A pure function of its inputs for a given bundle, so the result can be cached
+    With intervals=True it includes the P10/P50/P90 prediction interval
+    coalesce=False keeps the row out of the micro-batcher (warm-up)
+    """
+    # Model prediction smoothed against the previous month, then seasonal adjustments,
+    # with its P10/P50/P90 interval from the same pass over the trees
+    prediction_values, quantiles = predict_footfall_values(bundle, [location], [year], [month], [rolling_avg],
+                                                           coalesce=coalesce, intervals=True, trace=trace)
+
+    # Convert to integer and ensure reasonable bounds without artificial caps
+    prediction = int(round(max(0, prediction_values[0])))
+    prediction_interval = interval_payload(quantiles[0], prediction)
+
+    # Confidence from the spread of the trees; the heuristic one for models without intervals
+    if prediction_interval is not None:
+        confidence = prediction_interval['confidence']
+    else:
+        confidence = float(heuristic_confidence(location_codes_for([location]), np.array([month]), [rolling_avg])[0])
+
+    insights_started = time.perf_counter()
+
+    # Generate insights based on model prediction
+    insights = []
+    suggestions = []
+
+    # Location-specific insights
+    if location == "Gulmarg":
+        if month in [12, 1, 2]:  # Winter months
+            insights.append(f"{location} is experiencing peak ski season in {month}/{year}. Expect maximum tourist inflow.")
+            if prediction > 50000:
+                insights.append("Strong visitor volume detected. Ensure adequate ski lift capacity.")
+                suggestions.append("Deploy additional ski instructors and equipment rental staff.")
+        else:
+            insights.append(f"{location} is in off-season. Lower tourist numbers expected.")
+    elif location == "Pahalgam":
+        if month in [5, 6, 7, 8]:  # Summer months
+            insights.append(f"{location} is experiencing peak summer season in {month}/{year}. Expect high tourist activity.")
+        else:
+            insights.append(f"{location} is in shoulder season. Moderate tourist activity expected.")
+
+    # General insights based on prediction magnitude
+    if prediction > 100000:
+        insights.append(f"Exceptionally high visitor volume ({prediction:,} visitors) predicted - in LAKHS range.")
+        suggestions.append("Coordinate with local authorities for traffic management.")
+        suggestions.append("Ensure adequate waste management and sanitation facilities.")
+    elif prediction > 60000:
+        insights.append(f"Very high visitor volume ({prediction:,} visitors) predicted.")
+        suggestions.append("Maintain standard staffing levels with on-call support.")
+    elif prediction > 30000:
+        insights.append(f"High visitor volume ({prediction:,} visitors) predicted.")
+        suggestions.append("Maintain standard staffing levels with on-call support.")
+    elif prediction > 10000:
+        insights.append(f"Moderate visitor volume ({prediction:,} visitors) predicted.")
+        suggestions.append("Standard staffing sufficient. Monitor booking trends.")
+    else:
+        insights.append(f"Lower visitor volume ({prediction:,} visitors) predicted.")
+        suggestions.append("Opportunity for targeted promotional campaigns.")
+
+    # Rolling average insight
+    if rolling_avg and 1000 <= rolling_avg <= 100000:
+        if rolling_avg > prediction * 1.2:
+            insights.append(f"Recent performance ({rolling_avg:,} avg) higher than prediction. Trend may be declining.")
+        elif rolling_avg < prediction * 0.8:
+            insights.append(f"Recent performance ({rolling_avg:,} avg) lower than prediction. Upward trend expected.")
+        else:
+            insights.append(f"Stable recent performance ({rolling_avg:,} avg) indicates predictable trends.")
+
+    # Resource requirements estimation
+    resource_requirements = calculate_resource_requirements(prediction)
+
+    # Comparative analysis (simplified)
+    comparative_data = {
+        'comparison_type': 'model_based',
+        'reference_period': f"{month}/{year}",
+        'reference_value': prediction,
+        'change': 0.0,
+        'trend': 'stable'
+    }
+
+    # Weather (year-specific where stored, else climatology) and holiday context
+    static_members, _ = STATIC_PREDICTION_FRAGMENTS[(location, month)]
+    weather, weather_source = prediction_weather(location, year, month)
+
+    prediction_data = {
+        'location': location,
+        'year': year,
+        'month': month,
+        'predicted_footfall': prediction,
+        'confidence': round(confidence, 2),
+        'prediction_interval': prediction_interval if intervals else None,
+        'comparative_analysis': comparative_data,
+        'weather': weather,
+        'weather_source': weather_source,
+        'holidays': static_members['holidays'],
+        'insights': insights,
+        'resource_suggestions': suggestions,
+        'resourceRequirements': resource_requirements
+    }
+    metrics.observe('stage_latency_seconds', time.perf_counter() - insights_started, stage='insights', path='model')
+    return prediction_data
+
+def get_model_prediction(bundle, location, year, month, rolling_avg, intervals=False):
+    """
+    (prediction payload, its rendered JSON, audit details) for one location/month from
+    the prediction cache, building and rendering it on a miss
+    """
+    # Full prediction payload is a pure function of the inputs for a given model version
+    cache_key = (bundle.version, location, year, month, rolling_avg, intervals)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        metrics.inc('prediction_cache_lookups_total', result='hit')
+        return cached
+    metrics.inc('prediction_cache_lookups_total', result='miss')
+    trace = {}
+    prediction_data = build_model_prediction(bundle, location, year, month, rolling_avg, trace=trace,
+                                             intervals=intervals)
+    smoothing, seasonal = adjustment_factors(trace)
+    details = {
+        'raw_prediction': float(trace['raw'][0]),
+        'previous_month_raw': float(trace['previous_raw'][0]),
+        'adjustments': {'smoothing': float(smoothing[0]), 'seasonal': float(seasonal[0])}
+    }
+    cached = (prediction_data, render_prediction(prediction_data), details)
+    prediction_cache.put(cache_key, cached)
+    return cached
+
+def audit_prediction(endpoint, bundle, variant, location, year, month, rolling_avg, prediction_data, details=None):
+    """Queue an audit record for one served prediction (model path if bundle is given, else fallback)"""
+    if not audit_log.sampled():
+        return
+    started = g.get('request_started')
+    audit_log.record({
+        'ts': time.time(),
+        'endpoint': endpoint,
+        'path': 'model' if bundle is not None else 'fallback',
+        'model_version': bundle.version if bundle is not None else None,
+        'model_variant': variant,
+        'location': location,
+        'year': year,
+        'month': month,
+        'rolling_avg': rolling_avg,
+        **(details or {}),
+        'prediction': prediction_data['predicted_footfall'],
+        'confidence': prediction_data['confidence'],
+        'latency_ms': (time.perf_counter() - started) * 1000 if started is not None else None
+    })
+
+def run_warmup(bundle, passes=MODEL_WARMUP_PASSES):
+    """
+    Run every location x month of the current year through the model path `passes` times:
+    the batched predictions (as /api/predict/batch and the grid use them) and the
+    single-request path with insights and serialization, so lazy initialization and
+    first-touch page faults happen before the bundle serves traffic.
+    Returns cold vs warm timings (None if disabled).
+    Nothing goes through the micro-batcher, whose thread must not start in a
+    pre-fork master.
+    """
+    if passes <= 0:
+        return None
+    year = datetime.now().year
+    rows = [(location, year, month, CATALOG_BASELINE_ROLLING_AVG)
+            for location in LOCATION_MAPPING for month in range(1, 13)]
+    locations, years, months, rolling_avgs = (list(column) for column in zip(*rows))
+
+    pass_ms = []
+    request_ms = []
+    for _ in range(passes):
+        started = time.perf_counter()
+        values = predict_footfall_values(bundle, locations, years, months, rolling_avgs)
+        predictions = np.round(np.maximum(0, values)).astype(int)
+        dumps({'predictions': predictions, **calculate_resource_requirements_batch(predictions)})
+        for index, row in enumerate(rows):
+            request_started = time.perf_counter()
+            render_prediction(build_model_prediction(bundle, *row, coalesce=False))
+            if index == 0:
+                request_ms.append((time.perf_counter() - request_started) * 1000)
+        pass_ms.append((time.perf_counter() - started) * 1000)
+
+    warmup = {
+        'passes': passes,
+        'rows': len(rows),
+        'cold_pass_ms': round(pass_ms[0], 2),
+        'warm_pass_ms': round(float(np.median(pass_ms[1:])), 2) if passes > 1 else None,
+        'cold_request_ms': round(request_ms[0], 3),
+        'warm_request_ms': round(float(np.median(request_ms[1:])), 3) if passes > 1 else None,
+        'completed_at': datetime.now().isoformat()
+    }
+    logger.info(f"✓ Warm-up: {len(rows)} rows x {passes} passes, cold {warmup['cold_pass_ms']:.1f}ms, "
+                f"warm {warmup['warm_pass_ms'] or 0:.1f}ms per pass")
+    return warmup
+
+# Bump when the prediction response format changes so clients drop their cached copies
+PREDICTION_FORMAT_VERSION = 5
+
+def prediction_etag(bundle, location, year, month, rolling_avg, intervals=False):
+    """Strong ETag for a model prediction: depends only on the inputs, the model version and the weather store"""
+    weather_version = weather_store.version if weather_store is not None else '-'
+    key = (f"{PREDICTION_FORMAT_VERSION}|{bundle.version}|{weather_version}|{location}|{year}|{month}|"
+           f"{rolling_avg!r}|{intervals}")
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+def parse_number(text, default):
+    """int or float from a query string value (default if absent, None if not a number)"""
+    if text is None or text == '':
+        return default
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def parse_forecast_range(args, max_years):
+    """
+    (year_start, year_end, rolling_avg, None) from forecast query parameters, or
+    (None, None, None, error message) if any of them is invalid
+    """
+    year_start = parse_number(args.get('year_start'), default=datetime.now().year)
+    year_end = parse_number(args.get('year_end'), default=year_start)
+    rolling_avg = parse_number(args.get('rolling_avg'), default=80000)
+
+    for name, year in (('year_start', year_start), ('year_end', year_end)):
+        if not is_whole_number(year) or not (MIN_PREDICTION_YEAR <= year <= MAX_PREDICTION_YEAR):
+            return None, None, None, (f'{name} must be a whole number between {MIN_PREDICTION_YEAR} '
+                                      f'and {MAX_PREDICTION_YEAR}')
+    if not is_number(rolling_avg) or rolling_avg < 0:
+        return None, None, None, 'rolling_avg must be a non-negative number'
+
+    year_start, _, rolling_avg = normalize_prediction_input(year_start, 1, rolling_avg)
+    year_end = int(year_end)
+    if year_end < year_start:
+        return None, None, None, 'year_end must not be before year_start'
+    if year_end - year_start + 1 > max_years:
+        return None, None, None, f'Year range too large (maximum {max_years} years)'
+    return year_start, year_end, rolling_avg, None
+
+def build_fallback_prediction(location, year, month, rolling_avg, now=None):
+    """
+    Build the 'prediction' payload for one location/month with the fallback algorithm
+    (used when no trained model is loaded)
+    """
+    result = fallback_predict_batch([location], [year], [month], [rolling_avg], now=now)
+    prediction = float(result['prediction'][0])
+    confidence = float(result['confidence'][0])
+    seasonal_trend = FALLBACK_TRENDS[result['trend'][0]]
+    change = float(result['change'][0])
+
+    if result['comparison_previous_month'][0]:
+        comparison_type = 'previous_month'
+    else:
+        comparison_type = 'same_month_last_year'
+    comparative_data = {
+        'comparison_type': comparison_type,
+        'reference_period': f"{result['reference_month'][0]}/{result['reference_year'][0]}",
+        'reference_value': int(round(result['reference_value'][0])),
+        'change': round(change, 1),
+        'trend': 'increase' if change > 0 else 'decrease'
+    }
+
+    weather = weather_for(location, month)
+    holidays = HOLIDAY_DATA.get(month, HOLIDAY_DATA[6])
+    static_members, _ = STATIC_PREDICTION_FRAGMENTS[(location, month)]
+
+    # Generate detailed insights including rolling average impact
+    insights = []
+
+    # Rolling average insight
+    if rolling_avg and 1000 <= rolling_avg <= 100000:
+        location_baseline = FALLBACK_LOCATION_BASE.get(location, FALLBACK_DEFAULT_BASE)
+        if rolling_avg > location_baseline * 1.3:
+            insights.append(f"Strong recent momentum detected ({rolling_avg:,} avg visitors). Expect continued growth.")
+        elif rolling_avg < location_baseline * 0.7:
+            insights.append(f"Recent decline in visitors ({rolling_avg:,} avg). Recovery may be gradual.")
+        else:
+            insights.append(f"Stable recent performance ({rolling_avg:,} avg visitors) indicates predictable trends.")
+
+    # Seasonal insight
+    if seasonal_trend == 'peak':
+        insights.append(f"{location} is experiencing peak season in {month}/{year}. Expect maximum tourist inflow.")
+    elif seasonal_trend == 'high':
+        insights.append(f"{location} is in high season. Good tourist activity expected.")
+    elif seasonal_trend == 'off':
+        insights.append(f"{location} is in off-season. Lower tourist numbers expected.")
+
+    # Weather insight
+    if weather['temp_mean'] > 25:
+        insights.append("High temperatures may affect visitor comfort. Consider cooling facilities.")
+    elif weather['temp_mean'] < 5:
+        insights.append("Cold temperatures may limit activities. Ensure proper heating facilities.")
+
+    if weather['precip'] > 100:
+        insights.append("High precipitation expected. May impact outdoor activities.")
+
+    # Holiday insight
+    if holidays['count'] > 3:
+        insights.append(f"{holidays['count']} holidays this month will likely boost tourism.")
+    elif holidays['count'] == 0:
+        insights.append("No major holidays this month may result in lower tourist numbers.")
+
+    # Growth insight based on comparison type
+    if comparative_data['change'] > 15:
+        if comparative_data['comparison_type'] == 'previous_month':
+            insights.append(f"Strong {comparative_data['change']:.1f}% month-over-month growth indicates increasing popularity.")
+        else:
+            insights.append(f"Strong {comparative_data['change']:.1f}% year-over-year growth for {month}/{year}.")
+    elif comparative_data['change'] < -15:
+        insights.append(f"Significant {abs(comparative_data['change']):.1f}% decline suggests decreasing interest.")
+
+    # Resource requirements estimation
+    resource_requirements = calculate_resource_requirements(prediction)
+
+    # Suggestions based on prediction
+    suggestions = []
+    if prediction > 50000:
+        suggestions.append("Coordinate with local authorities for traffic management.")
+        suggestions.append("Ensure adequate waste management and sanitation facilities.")
+    elif prediction > 20000:
+        suggestions.append("Maintain standard staffing levels with on-call support.")
+    else:
+        suggestions.append("Opportunity for targeted promotional campaigns.")
+
+    # Weather-based suggestions
+    if weather['temp_mean'] < 0:
+        suggestions.append("Ensure snow clearing equipment is ready for visitor pathways.")
+    elif weather['precip'] > 100:
+        suggestions.append("Have contingency plans for weather-related activity disruptions.")
+
+    # Holiday-based suggestions
+    if holidays['count'] > 2:
+        suggestions.append("Increase security and crowd management personnel during holiday periods.")
+
+    return {
+        'location': location,
+        'year': year,
+        'month': month,
+        'predicted_footfall': int(round(prediction)),
+        'confidence': round(confidence, 2),
+        'prediction_interval': None,
+        'comparative_analysis': comparative_data,
+        'weather': static_members['weather'],
+        'weather_source': 'climatology',
+        'holidays': static_members['holidays'],
+        'insights': insights,
+        'resource_suggestions': suggestions,
+        'resourceRequirements': resource_requirements
+    }
+
+@app.route('/api/shadow/stats', methods=['GET'])
+def shadow_stats():
+    """Candidate model status and its prediction deltas / latency against the primary model"""
+    if shadow_scorer is None:
+        return jsonify({'enabled': False})
+    bundle = registry.current()
+    return json_response({
+        'enabled': True,
+        'primary_version': bundle.version if bundle is not None else None,
+        'candidate': candidate_registry.status(),
+        'candidate_traffic_percent': CANDIDATE_TRAFFIC_PERCENT,
+        **shadow_scorer.stats()
+    })
+
+@app.route('/api/batching/stats', methods=['GET'])
+def batching_stats():
+    """Micro-batching batch size and queue wait histograms"""
+    if micro_batcher is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **micro_batcher.stats()})
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    """
+    Predict footfall for given location and date with detailed insights
+
+    Expected JSON:
+    {
+        "location": "Gulmarg",
+        "year": 2024,
+        "month": 12,
+        "rolling_avg": 95000,  (optional)
+        "intervals": true      (optional: add the P10/P50/P90 prediction interval)
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        # Validate inputs
+        location = data.get('location')
+        year = data.get('year')
+        month = data.get('month')
+        rolling_avg = data.get('rolling_avg', 80000)
+        intervals = data.get('intervals') is True
+
+        validation_error = validate_prediction_input(location, year, month, rolling_avg)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        year, month, rolling_avg = normalize_prediction_input(year, month, rolling_avg)
+
+        # Read the model bundle once so the whole request uses a consistent model/scaler pair
+        # (the candidate for an A/B share of inputs, when one is configured)
+        bundle, variant, other = select_bundle(location, year, month, rolling_avg)
+
+        # Use the actual trained ML model for prediction if available
+        if bundle is not None:
+            g.prediction_path = 'model'
+            prediction_started = time.perf_counter()
+            prediction_data, prediction_json, details = get_model_prediction(bundle, location, year, month,
+                                                                             rolling_avg, intervals)
+            served_ms = (time.perf_counter() - prediction_started) * 1000
+            audit_prediction('predict', bundle, variant, location, year, month, rolling_avg, prediction_data, details)
+
+            with metrics.timer('stage_latency_seconds', stage='serialize', path='model'):
+                # The cached prediction is already rendered; only the envelope is serialized
+                response = dumps({
+                    'success': True,
+                    'timestamp': datetime.now().isoformat(),
+                    'model_used': True,
+                    'target_transform': bundle.target_transform,  # Added to indicate the transformation used
+                    'model_variant': variant
+                })
+                response = json_response(splice(response, {'prediction': prediction_json}))
+            return shadow_after_response(response, 'predict', bundle, variant, other,
+                                         ([location], [year], [month], [rolling_avg]),
+                                         [prediction_data['predicted_footfall']], served_ms)
+        
+        else:
+            # Fallback to custom algorithm if model not available
+            g.prediction_path = 'fallback'
+            fallback_started = time.perf_counter()
+            now = datetime.now()
+
+            if FALLBACK_SEED is not None:
+                # Seeded fallback results are deterministic; the comparison depends on the current month
+                cache_key = ('fallback', location, year, month, rolling_avg, now.year, now.month)
+                cached = prediction_cache.get(cache_key)
+                if cached is None:
+                    prediction_data = build_fallback_prediction(location, year, month, rolling_avg, now=now)
+                    cached = (prediction_data, render_prediction(prediction_data))
+                    prediction_cache.put(cache_key, cached)
+                prediction_data, prediction_json = cached
+            else:
+                prediction_data = build_fallback_prediction(location, year, month, rolling_avg, now=now)
+                prediction_json = render_prediction(prediction_data)
+            
+            metrics.observe('stage_latency_seconds', time.perf_counter() - fallback_started, stage='fallback', path='fallback')
+            audit_prediction('predict', None, None, location, year, month, rolling_avg, prediction_data)
+            
+            with metrics.timer('stage_latency_seconds', stage='serialize', path='fallback'):
+                response = dumps({
+                    'success': True,
+                    'timestamp': now.isoformat(),
+                    'model_used': False
+                })
+                return json_response(splice(response, {'prediction': prediction_json}))
+    except QueueFullError as e:
+        logger.warning(f"Prediction rejected: {str(e)}")
+        return jsonify({'error': 'Server busy', 'details': str(e)}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}")
+        return jsonify({'error': 'Prediction failed', 'details': str(e)}), 500
+
+@app.route('/api/predict', methods=['GET'])
+def predict_conditional():
+    """
+    Cacheable GET variant of /api/predict for repeat clients
+
+    Query parameters: location, year, month, rolling_avg (optional, default 80000),
+    intervals (optional: 1 adds the P10/P50/P90 prediction interval)
+
+    Model predictions carry a strong ETag derived from the inputs and the model version,
+    and the body has no per-request timestamp. A request whose If-None-Match matches
+    gets 304 Not Modified without any computation.
+    """
+    try:
+        location = request.args.get('location')
+        year = request.args.get('year', type=int)
+        month = request.args.get('month', type=int)
+        rolling_avg = parse_number(request.args.get('rolling_avg'), default=80000)
+        intervals = request.args.get('intervals') in ('1', 'true')
+
+        if rolling_avg is None:
+            return jsonify({'error': 'rolling_avg must be a number'}), 400
+
+        validation_error = validate_prediction_input(location, year, month, rolling_avg)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        year, month, rolling_avg = normalize_prediction_input(year, month, rolling_avg)
+
+        bundle, variant, other = select_bundle(location, year, month, rolling_avg)
+        if bundle is None:
+            # Fallback predictions include random variance - not cacheable
+            g.prediction_path = 'fallback'
+            prediction_data = build_fallback_prediction(location, year, month, rolling_avg)
+            audit_prediction('predict_conditional', None, None, location, year, month, rolling_avg, prediction_data)
+            response = dumps({'success': True, 'timestamp': datetime.now().isoformat(), 'model_used': False})
+            return json_response(splice(response, {'prediction': render_prediction(prediction_data)}),
+                                 headers={'Cache-Control': 'no-store'})
+
+        g.prediction_path = 'model'
+        etag = prediction_etag(bundle, location, year, month, rolling_avg, intervals)
+        if request.if_none_match.contains(etag):
+            metrics.inc('conditional_requests_total', result='not_modified')
+            response = Response(status=304, headers={'Cache-Control': 'no-cache'})
+            response.set_etag(etag)
+            return response
+
+        metrics.inc('conditional_requests_total', result='full')
+        prediction_started = time.perf_counter()
+        prediction_data, prediction_json, details = get_model_prediction(bundle, location, year, month, rolling_avg,
+                                                                         intervals)
+        served_ms = (time.perf_counter() - prediction_started) * 1000
+        audit_prediction('predict_conditional', bundle, variant, location, year, month, rolling_avg,
+                         prediction_data, details)
+        with metrics.timer('stage_latency_seconds', stage='serialize', path='model'):
+            response = dumps({
+                'success': True,
+                'model_used': True,
+                'target_transform': bundle.target_transform,
+                'model_version': bundle.version,
+                'model_variant': variant
+            })
+            response = json_response(splice(response, {'prediction': prediction_json}),
+                                     headers={'Cache-Control': 'no-cache'})
+        response.set_etag(etag)
+        return shadow_after_response(response, 'predict', bundle, variant, other,
+                                     ([location], [year], [month], [rolling_avg]),
+                                     [prediction_data['predicted_footfall']], served_ms)
+    except QueueFullError as e:
+        logger.warning(f"Prediction rejected: {str(e)}")
+        return jsonify({'error': 'Server busy', 'details': str(e)}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}")
+        return jsonify({'error': 'Prediction failed', 'details': str(e)}), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Predict footfall for many location/year/month rows in one vectorized pass
+
+    Expected JSON:
+    {
+        "rows": [
+            {"location": "Gulmarg", "year": 2024, "month": 12, "rolling_avg": 95000},
+            {"location": "Pahalgam", "year": 2024, "month": 6}
+        ],
+        "intervals": true    (optional: add P10/P50/P90 prediction intervals)
+    }
+    """
+    try:
+        data = request.get_json()
+        rows = data.get('rows') if isinstance(data, dict) else None
+
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'Missing required field: rows (non-empty list)'}), 400
+
+        if len(rows) > MAX_BATCH_ROWS:
+            return jsonify({'error': f'Too many rows: {len(rows)} (maximum {MAX_BATCH_ROWS})'}), 400
+
+        locations, years, months, rolling_avgs = [], [], [], []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                return jsonify({'error': f'Row {index}: expected an object'}), 400
+            validation_error = validate_prediction_input(row.get('location'), row.get('year'), row.get('month'),
+                                                         row.get('rolling_avg', 80000))
+            if validation_error:
+                return jsonify({'error': f'Row {index}: {validation_error}'}), 400
+            year, month, rolling_avg = normalize_prediction_input(row['year'], row['month'],
+                                                                  row.get('rolling_avg', 80000))
+            locations.append(row['location'])
+            years.append(year)
+            months.append(month)
+            rolling_avgs.append(rolling_avg)
+
+        intervals = data.get('intervals') is True
+        bundle = registry.current()
+        quantiles = None
+        trace = {}
+        if bundle is not None:
+            # One feature matrix and one inference pass for the whole batch (intervals come from
+            # the same pass over the trees); the matrix is reused for shadow scoring
+            prediction_started = time.perf_counter()
+            scaled_features = footfall_feature_matrix(bundle, locations, years, months, rolling_avgs)
+            prediction_values = predict_footfall_values(bundle, locations, years, months, rolling_avgs,
+                                                        intervals=intervals, scaled_features=scaled_features,
+                                                        trace=trace)
+            if intervals:
+                prediction_values, quantiles = prediction_values
+            served_ms = (time.perf_counter() - prediction_started) * 1000
+        else:
+            # Fallback algorithm, also computed for the whole batch at once
+            prediction_values = fallback_predict_batch(locations, years, months, rolling_avgs)['prediction']
+        predictions = np.round(np.maximum(0, prediction_values)).astype(int)
+
+        requirements = calculate_resource_requirements_batch(predictions)
+        staff, vehicles, rooms = (requirements[resource].tolist() for resource in RESOURCE_TYPES)
+
+        results = []
+        for index, (location, year, month, prediction) in enumerate(zip(locations, years, months, predictions.tolist())):
+            result = {
+                'location': location,
+                'year': year,
+                'month': month,
+                'predicted_footfall': prediction,
+                'resourceRequirements': {'staff': staff[index], 'vehicles': vehicles[index], 'rooms': rooms[index]}
+            }
+            if intervals:
+                result['prediction_interval'] = (interval_payload(quantiles[index], prediction)
+                                                 if quantiles is not None else None)
+            results.append(result)
+
+        if audit_log.sampled():
+            # One columnar record per batch; arrays are serialized by the audit log's writer thread
+            audit_record = {
+                'ts': time.time(),
+                'endpoint': 'predict_batch',
+                'path': 'model' if bundle is not None else 'fallback',
+                'model_version': bundle.version if bundle is not None else None,
+                'rows': len(results),
+                'location': locations,
+                'year': years,
+                'month': months,
+                'rolling_avg': rolling_avgs
+            }
+            if bundle is not None:
+                smoothing, seasonal = adjustment_factors(trace)
+                audit_record['raw_prediction'] = trace['raw']
+                audit_record['adjustments'] = {'smoothing': smoothing, 'seasonal': seasonal}
+            audit_record['prediction'] = predictions
+            audit_record['latency_ms'] = (time.perf_counter() - g.request_started) * 1000
+            audit_log.record(audit_record)
+
+        if bundle is None:
+            return json_response({
+                'success': True,
+                'count': len(results),
+                'predictions': results,
+                'timestamp': datetime.now().isoformat(),
+                'model_used': False
+            })
+
+        response = json_response({
+            'success': True,
+            'count': len(results),
+            'predictions': results,
+            'timestamp': datetime.now().isoformat(),
+            'model_used': True,
+            'target_transform': bundle.target_transform,
+            'model_version': bundle.version
+        })
+        candidate = candidate_registry.current() if candidate_registry is not None else None
+        return shadow_after_response(response, 'predict_batch', bundle, 'primary', candidate,
+                                     (locations, years, months, rolling_avgs), predictions, served_ms,
+                                     scaled_features=scaled_features)
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}")
+        return jsonify({'error': 'Batch prediction failed', 'details': str(e)}), 500
+
+@app.route('/api/predict/sweep', methods=['POST'])
+def predict_sweep():
+    """
+    What-if sensitivity table for one location/month: every combination of the
+    override values is scored in one batched inference
+
+    Expected JSON:
+    {
+        "location": "Gulmarg",
+        "year": 2024,
+        "month": 12,
+        "rolling_avg": 80000,    (optional, base value)
+        "overrides": {
+            "rolling_avg": [80000, 96000, 112000],
+            "temperature_2m_mean": [-8, -6, -4],
+            "holiday_count": [2, 4]
+        }
+    }
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        location = data.get('location')
+        year = data.get('year')
+        month = data.get('month')
+        rolling_avg = data.get('rolling_avg', 80000)
+        overrides = data.get('overrides')
+
+        validation_error = (validate_prediction_input(location, year, month, rolling_avg)
+                            or validate_sweep_overrides(overrides))
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        year, month, rolling_avg = normalize_prediction_input(year, month, rolling_avg)
+
+        bundle = registry.current()
+        if bundle is None:
+            return jsonify({'error': 'Model not loaded. What-if sweeps require the trained model.'}), 503
+
+        base, base_values, dimensions, scenario_values, predictions = run_sweep(bundle, location, year, month,
+                                                                                rolling_avg, overrides)
+        rows = []
+        for values, prediction in zip(scenario_values.tolist(), predictions.tolist()):
+            rows.append([sweep_value(value) for value in values] + [
+                prediction,
+                prediction - base,
+                round((prediction - base) / base * 100, 1) if base else None
+            ])
+
+        return json_response({
+            'success': True,
+            'location': location,
+            'year': year,
+            'month': month,
+            'base': {
+                'features': {dimension: sweep_value(value) for dimension, value in zip(dimensions, base_values.tolist())},
+                'predicted_footfall': base
+            },
+            'columns': dimensions + ['predicted_footfall', 'change', 'change_pct'],
+            'rows': rows,
+            'count': len(rows),
+            'timestamp': datetime.now().isoformat(),
+            'model_used': True,
+            'model_version': bundle.version
+        })
+    except Exception as e:
+        logger.error(f"Sweep prediction error: {str(e)}")
+        return jsonify({'error': 'Sweep prediction failed', 'details': str(e)}), 500
+
+@app.route('/api/resources/plan', methods=['POST'])
+def resource_plan():
+    """
+    Season-wide resource plan: predicted footfall and staff/vehicle/room requirements
+    for every requested location x month, totals by month and by location, and months
+    where the combined requirement exceeds a capacity
+
+    Expected JSON:
+    {
+        "year": 2024,
+        "months": [12, 1, 2],    (optional, default all 12; a month smaller than the one
+                                  before it belongs to the next year, so seasons can wrap)
+        "locations": ["Gulmarg", "Pahalgam"],    (optional, default all locations)
+        "rolling_avg": 80000,    (optional)
+        "capacity": {"staff": 400, "vehicles": 150, "rooms": 15000, "footfall": 300000}    (optional)
+    }
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        year = data.get('year')
+        months = data.get('months', list(range(1, 13)))
+        locations = data.get('locations', list(LOCATION_MAPPING.keys()))
+        rolling_avg = data.get('rolling_avg', 80000)
+        capacity = data.get('capacity')
+        if capacity is None:
+            capacity = {}
+
+        if year is None:
+            return jsonify({'error': 'Missing required field: year'}), 400
+        if not is_whole_number(year) or not (MIN_PREDICTION_YEAR <= year <= MAX_PREDICTION_YEAR):
+            return jsonify({'error': f'Year must be a whole number between {MIN_PREDICTION_YEAR} '
+                                     f'and {MAX_PREDICTION_YEAR}'}), 400
+        if not is_number(rolling_avg) or rolling_avg < 0:
+            return jsonify({'error': 'rolling_avg must be a non-negative number'}), 400
+        year, _, rolling_avg = normalize_prediction_input(year, 1, rolling_avg)
+        if (not isinstance(months, list) or not months
+                or not all(isinstance(month, int) and not isinstance(month, bool) and 1 <= month <= 12
+                           for month in months)
+                or len(set(months)) != len(months)):
+            return jsonify({'error': 'months must be a non-empty list of distinct months (1-12)'}), 400
+        if (not isinstance(locations, list) or not locations
+                or not all(isinstance(location, str) for location in locations)
+                or len(set(locations)) != len(locations)):
+            return jsonify({'error': 'locations must be a non-empty list of distinct location names'}), 400
+        unknown = [location for location in locations if location not in LOCATION_MAPPING]
+        if unknown:
+            return jsonify({'error': f"Unknown location: {', '.join(unknown)}"}), 400
+        cell_count = len(locations) * len(months)
+        if cell_count > MAX_BATCH_ROWS:
+            return jsonify({'error': f'Too many rows: {cell_count} (maximum {MAX_BATCH_ROWS})'}), 400
+        capacity_keys = ('footfall',) + RESOURCE_TYPES
+        if not isinstance(capacity, dict) or not all(
+                key in capacity_keys and is_number(value) and value >= 0 for key, value in capacity.items()):
+            return jsonify({'error': f"capacity must map {', '.join(capacity_keys)} to non-negative numbers"}), 400
+
+        # Months after a wrap-around (e.g. December -> January) fall in the next year
+        period_years = year + np.concatenate([[0], np.cumsum(np.diff(months) < 0)])
+        cell_locations = [location for location in locations for _ in months]
+        cell_years = np.tile(period_years, len(locations))
+        cell_months = np.tile(months, len(locations))
+        cell_rolling_avgs = [rolling_avg] * len(cell_locations)
+
+        bundle = registry.current()
+        if bundle is not None:
+            prediction_values = predict_footfall_values(bundle, cell_locations, cell_years, cell_months,
+                                                        cell_rolling_avgs)
+        else:
+            prediction_values = fallback_predict_batch(cell_locations, cell_years, cell_months,
+                                                       cell_rolling_avgs)['prediction']
+
+        # locations x months arrays for footfall and every resource
+        shape = (len(locations), len(months))
+        footfall = np.round(np.maximum(0, prediction_values)).astype(int)
+        plan = {'footfall': footfall.reshape(shape)}
+        plan.update({resource: values.reshape(shape)
+                     for resource, values in calculate_resource_requirements_batch(footfall).items()})
+
+        month_totals = {name: values.sum(axis=0) for name, values in plan.items()}
+        location_totals = {name: values.sum(axis=1) for name, values in plan.items()}
+        over_capacity = {name: month_totals[name] > limit for name, limit in capacity.items()}
+
+        by_month = []
+        for index, (period_year, month) in enumerate(zip(period_years.tolist(), months)):
+            entry = {'year': period_year, 'month': month}
+            entry.update({name: int(totals[index]) for name, totals in month_totals.items()})
+            entry['over_capacity'] = [name for name, exceeded in over_capacity.items() if exceeded[index]]
+            by_month.append(entry)
+
+        by_location = {}
+        for index, location in enumerate(locations):
+            by_location[location] = {
+                'monthly': {name: values[index].tolist() for name, values in plan.items()},
+                'totals': {name: int(totals[index]) for name, totals in location_totals.items()}
+            }
+
+        return json_response({
+            'success': True,
+            'locations': locations,
+            'periods': [{'year': period_year, 'month': month} for period_year, month in zip(period_years.tolist(), months)],
+            'rolling_avg': rolling_avg,
+            'capacity': capacity,
+            'by_month': by_month,
+            'by_location': by_location,
+            'totals': {name: int(values.sum()) for name, values in plan.items()},
+            'months_over_capacity': sum(1 for entry in by_month if entry['over_capacity']),
+            'timestamp': datetime.now().isoformat(),
+            'model_used': bundle is not None,
+            'model_version': bundle.version if bundle is not None else None
+        })
+    except Exception as e:
+        logger.error(f"Resource plan error: {str(e)}")
+        return jsonify({'error': 'Resource plan failed', 'details': str(e)}), 500
+
+@app.route('/api/forecast/grid', methods=['GET'])
+def forecast_grid():
+    """
+    Predicted footfall for every location x 12 months x a range of years in one call
+
+    Query parameters:
+        year_start (default: current year)
+        year_end (default: year_start)
+        rolling_avg (default: 80000)
+        intervals (optional: 1 adds P10/P50/P90 grids, when the model provides them)
+    """
+    try:
+        year_start, year_end, rolling_avg, range_error = parse_forecast_range(request.args, MAX_GRID_YEARS)
+        intervals = request.args.get('intervals') in ('1', 'true')
+
+        if range_error:
+            return jsonify({'error': range_error}), 400
+
+        bundle = registry.current()
+        if bundle is None:
+            return jsonify({'error': 'Model not loaded. Grid forecasts require the trained model.'}), 503
+
+        years = list(range(year_start, year_end + 1))
+        locations = list(LOCATION_MAPPING.keys())
+        payload = {
+            'success': True,
+            'locations': locations,
+            'months': list(range(1, 13)),
+            'years': years,
+            'rolling_avg': rolling_avg
+        }
+
+        if intervals and bundle.artifacts.get('interval_engine') is not None:
+            grids = compute_forecast_grid(bundle, years, rolling_avg, intervals=True)
+            payload['grid'] = {
+                str(year): {location: row for location, row in zip(locations, grids[year][0].tolist())}
+                for year in years
+            }
+            payload['intervals'] = {
+                str(year): {
+                    location: {'p10': p10, 'p50': p50, 'p90': p90}
+                    for location, p10, p50, p90 in zip(locations, *grids[year][1:].tolist())
+                }
+                for year in years
+            }
+        else:
+            grids = compute_forecast_grid(bundle, years, rolling_avg)
+            payload['grid'] = {
+                str(year): {location: row for location, row in zip(locations, grids[year].tolist())}
+                for year in years
+            }
+            if intervals:
+                payload['intervals'] = None
+
+        payload.update({
+            'timestamp': datetime.now().isoformat(),
+            'model_used': True,
+            'model_version': bundle.version
+        })
+        return json_response(payload)
+    except Exception as e:
+        logger.error(f"Grid forecast error: {str(e)}")
+        return jsonify({'error': 'Grid forecast failed', 'details': str(e)}), 500
+
+@app.route('/api/forecast/stream', methods=['GET'])
+def forecast_stream():
+    """
+    Stream predicted footfall as newline-delimited JSON (one object per line),
+    ordered by year, location and month, for long planning horizons
+
+    Query parameters:
+        year_start (default: current year)
+        year_end (default: year_start)
+        rolling_avg (default: 80000)
+        locations (optional comma-separated list, default: all locations)
+    """
+    # Everything is validated before the stream opens: once it has, errors can only be NDJSON lines
+    year_start, year_end, rolling_avg, range_error = parse_forecast_range(request.args, MAX_STREAM_YEARS)
+    locations_param = request.args.get('locations')
+    locations = locations_param.split(',') if locations_param else list(LOCATION_MAPPING.keys())
+
+    if range_error:
+        return jsonify({'error': range_error}), 400
+
+    if len(set(locations)) != len(locations):
+        return jsonify({'error': 'locations must not repeat'}), 400
+
+    unknown = [location for location in locations if location not in LOCATION_MAPPING]
+    if unknown:
+        return jsonify({'error': f"Unknown location: {', '.join(unknown)}"}), 400
+
+    # The whole stream is scored with the model bundle current when it started
+    bundle = registry.current()
+    if bundle is None:
+        return jsonify({'error': 'Model not loaded. Streamed forecasts require the trained model.'}), 503
+
+    total = (year_end - year_start + 1) * len(locations) * 12
+    return Response(
+        generate_forecast_stream(bundle, locations, year_start, year_end, rolling_avg),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Let reverse proxies pass each batch through immediately
+            'X-Row-Count': str(total),
+            'X-Model-Version': bundle.version
+        }
+    )
+
+# Load the model in the background so the process starts serving (liveness) immediately;
+# models/ is then watched for retrained artifacts. /api/health/ready reports progress.
+# Started last: preparing a bundle uses the prediction helpers defined above.
+registry.load_in_background()
+if candidate_registry is not None:
+    candidate_registry.load_in_background()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # No reloader: it would import this module twice (two model loads, two artifact watchers).
+    # The debugger is opt-in, since it executes code sent from the browser.
+    app.run(debug=os.environ.get('FLASK_DEBUG', '0') == '1', use_reloader=False, host='0.0.0.0', port=5000)
@@ -0,0 +1,166 @@
+"""
+Structured prediction audit log for the Kashmir Tourism Footfall Prediction API
+Request threads enqueue records; a background thread writes them in batches to
+rotating JSONL files, so logging never blocks or slows down a request
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """
+    Bounded, sampled, asynchronous JSONL writer.
+
+    Callers check sampled() (true for a sample_rate share of calls) before building a
+    record; record() puts it on a bounded queue without blocking, dropping (and
+    counting) it when the queue is full.
+    Records may hold NumPy arrays - they are only serialized by the writer thread.
+    The writer collects up to batch_size records (or whatever arrived within
+    flush_interval seconds) and appends them with one write. Files rotate at
+    max_bytes, keeping `backups` old files (path.1 is the newest).
+    A '{pid}' in path is replaced by the process id, so server workers never share a file.
+    """
+
+    def __init__(self, path, sample_rate=1.0, max_queue=10000, batch_size=256, flush_interval=1.0,
+                 max_bytes=50 * 1024 * 1024, backups=5, name='audit-log'):
+        self.path_template = path
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._path = None
+
+        self.enqueued = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+        atexit.register(self.flush)
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def sampled(self):
+        """Whether to keep the next record; lets callers skip building sampled-out records"""
+        if self.sample_rate >= 1:
+            return True
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def record(self, entry):
+        """Queue a record (a dict) kept by sampled(); dropped if the queue is full. Never blocks."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(entry)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self):
+        # Started lazily so forked server workers each get their own thread (and file)
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def flush(self):
+        """Write everything still queued (called at interpreter exit)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            data = b''.join(dumps(entry) + b'\n' for entry in batch)
+            with self._write_lock:
+                self._open()
+                if self.max_bytes and self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+                    self._rotate()
+                self._file.write(data)
+                self._file.flush()
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Audit log write failed ({len(batch)} records lost): {str(e)}")
+
+    def _open(self):
+        path = self.path_template.replace('{pid}', str(os.getpid()))
+        if self._file is not None and path == self._path:
+            return
+        if self._file is not None:
+            self._file.close()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._path = path
+        self._file = open(path, 'ab')
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self._path}.{index}"):
+                os.replace(f"{self._path}.{index}", f"{self._path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            os.remove(self._path)
+        self._file = open(self._path, 'ab')
+        self.rotations += 1
+
+    def stats(self):
+        return {
+            'path': self._path or self.path_template,
+            'sample_rate': self.sample_rate,
+            'queue_size': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'enqueued': self.enqueued,
+            'sampled_out': self.sampled_out,
+            'dropped': self.dropped,
+            'written': self.written,
+            'batches': self.batches,
+            'rotations': self.rotations,
+            'errors': self.errors
+        }
@@ -0,0 +1,68 @@
+"""
+Benchmark the flat tree engine against model.predict
+
+Run from the repository root:
+
+    python backend/benchmarks/bench_tree_engine.py [--repeat-seconds 1.0]
+
+Reports the mean latency of model.predict (as pickled and with n_jobs=1) and of
+FlatTreeEnsemble.predict for batch sizes 1, 10, 120 and 10,000 rows.
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tree_engine import export_model  # noqa: E402
+
+MODEL_PATH = os.path.join('models', 'best_model', 'model.pkl')
+BATCH_SIZES = [1, 10, 120, 10000]
+
+
+def time_call(function, repeat_seconds):
+    """Mean seconds per call, repeating for roughly repeat_seconds (at least 3 calls)"""
+    function()  # warm-up
+    calls = 0
+    start = time.perf_counter()
+    while calls < 3 or time.perf_counter() - start < repeat_seconds:
+        function()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat-seconds', type=float, default=1.0)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    rng = np.random.default_rng(42)
+    rows = rng.standard_normal((max(BATCH_SIZES), model.n_features_in_))
+
+    engine, difference = export_model(model, rows[:2000])
+    if engine is None:
+        sys.exit(f"Model {type(model).__name__} could not be exported (difference: {difference})")
+
+    print(f"Model: {type(model).__name__} ({engine.n_trees} trees, {engine.n_nodes} nodes, "
+          f"max depth {engine.max_depth}), max difference {difference:.3g}")
+    print(f"{'rows':>8} {'model.predict':>15} {'n_jobs=1':>12} {'flat engine':>12} {'speedup':>9}")
+
+    pickled_n_jobs = getattr(model, 'n_jobs', None)
+    for batch_size in BATCH_SIZES:
+        batch = rows[:batch_size]
+        model.n_jobs = pickled_n_jobs
+        model_seconds = time_call(lambda: model.predict(batch), args.repeat_seconds)
+        model.n_jobs = 1
+        single_job_seconds = time_call(lambda: model.predict(batch), args.repeat_seconds)
+        engine_seconds = time_call(lambda: engine.predict(batch), args.repeat_seconds)
+        print(f"{batch_size:>8} {model_seconds * 1e3:>12.3f} ms {single_job_seconds * 1e3:>9.3f} ms "
+              f"{engine_seconds * 1e3:>9.3f} ms {model_seconds / engine_seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
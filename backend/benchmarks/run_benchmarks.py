@@ -0,0 +1,263 @@
+"""
+Micro-benchmark suite for the prediction pipeline in backend/app.py
+
+Run from the repository root:
+
+    python backend/benchmarks/run_benchmarks.py                  # run and compare with baseline.json
+    python backend/benchmarks/run_benchmarks.py --save-baseline  # run and store a new baseline
+    python backend/benchmarks/run_benchmarks.py --stub           # force the synthetic model
+
+Times prepare_features, scaling, model.predict, the flat tree engine, the full
+/api/predict model path and the fallback path (through the Flask test client)
+at several batch sizes. When models/*.pkl is missing (or with --stub) a synthetic
+17-feature model and scaler are generated, so the suite runs on any machine.
+
+Results are written as JSON. A benchmark whose mean is more than --tolerance
+slower than the stored baseline is reported as a regression (exit code 1).
+Timings are only compared when the baseline was recorded in the same environment
+(Python, numpy and scikit-learn versions, machine, CPU count and model mode);
+otherwise the run exits with code 2 and the baseline has to be re-recorded there.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS_DIR, 'latest_results.json')
+BATCH_SIZES = [1, 10, 120, 1000]
+ARTIFACTS = [
+    os.path.join('models', 'best_model', 'model.pkl'),
+    os.path.join('models', 'scaler.pkl'),
+    os.path.join('models', 'best_model', 'metadata.pkl'),
+]
+# Environment fields that must match the baseline for timings to be comparable
+COMPARABLE_ENVIRONMENT = ('python', 'numpy', 'sklearn', 'machine', 'cpu_count', 'stub_model')
+
+
+def create_stub_artifacts(directory):
+    """
+    Write a synthetic RandomForestRegressor + StandardScaler with the same 17 features
+    (and log target) as the real model under directory/models
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(42)
+    n_rows = 2000
+    features = np.column_stack([
+        rng.integers(1, 11, n_rows),              # location_encoded
+        rng.integers(2015, 2026, n_rows),         # year
+        rng.integers(1, 13, n_rows),              # month
+        rng.integers(1, 5, n_rows),               # season
+        rng.uniform(1000, 100000, n_rows),        # footfall_rolling_avg
+        rng.normal(10, 8, (n_rows, 12)),          # weather, interactions and holidays
+    ])
+    target = np.log(features[:, 4] * rng.uniform(0.5, 1.5, n_rows))
+
+    scaler = StandardScaler().fit(features)
+    model = RandomForestRegressor(n_estimators=100, max_depth=15, min_samples_leaf=2,
+                                  random_state=42).fit(scaler.transform(features), target)
+
+    os.makedirs(os.path.join(directory, 'models', 'best_model'))
+    joblib.dump(model, os.path.join(directory, ARTIFACTS[0]))
+    joblib.dump(scaler, os.path.join(directory, ARTIFACTS[1]))
+    joblib.dump({'model_type': 'randomforestregressor', 'num_features': 17, 'target_transform': 'log',
+                 'stub': True}, os.path.join(directory, ARTIFACTS[2]))
+
+
+def measure(function, min_seconds):
+    """Call function repeatedly for about min_seconds and summarize per-call latency"""
+    function()  # warm-up
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < 5 or time.perf_counter() - started < min_seconds:
+        call_started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - call_started)
+    durations = np.array(durations) * 1e6
+    return {
+        'calls': len(durations),
+        'mean_us': round(float(durations.mean()), 2),
+        'p50_us': round(float(np.percentile(durations, 50)), 2),
+        'p95_us': round(float(np.percentile(durations, 95)), 2),
+    }
+
+
+def run_suite(app_module, min_seconds):
+    """Return {benchmark name: latency summary}"""
+    from tree_engine import export_model
+
+    bundle = app_module.registry.current()
+    locations = list(app_module.LOCATION_MAPPING.keys())
+    rng = np.random.default_rng(0)
+    results = {}
+
+    for batch_size in BATCH_SIZES:
+        rows = (
+            [locations[i] for i in rng.integers(0, len(locations), batch_size)],
+            rng.integers(2020, 2031, batch_size).tolist(),
+            rng.integers(1, 13, batch_size).tolist(),
+            rng.uniform(5000, 100000, batch_size).tolist(),
+        )
+        raw = app_module.prepare_features_batch(*rows)
+        scaled = app_module.scale_features_batch(bundle, *rows)
+
+        results[f'prepare_features_batch[{batch_size}]'] = measure(
+            lambda: app_module.prepare_features_batch(*rows), min_seconds)
+        results[f'scaler.transform[{batch_size}]'] = measure(
+            lambda: bundle.scaler.transform(raw), min_seconds)
+        results[f'scale_features_batch[{batch_size}]'] = measure(
+            lambda: app_module.scale_features_batch(bundle, *rows), min_seconds)
+        results[f'model.predict[{batch_size}]'] = measure(
+            lambda: bundle.model.predict(scaled), min_seconds)
+        results[f'predict_footfall_values[{batch_size}]'] = measure(
+            lambda: app_module.predict_footfall_values(bundle, *rows), min_seconds)
+
+    engine, _ = export_model(bundle.model, app_module.scale_features_batch(
+        bundle, locations * 12, [2025] * 120, list(range(1, 13)) * 10, [80000] * 120))
+    if engine is not None:
+        for batch_size in BATCH_SIZES:
+            scaled = rng.standard_normal((batch_size, app_module.NUM_FEATURES))
+            results[f'flat_tree_engine.predict[{batch_size}]'] = measure(
+                lambda: engine.predict(scaled), min_seconds)
+
+    client = app_module.app.test_client()
+    payloads = [{'location': location, 'year': 2025, 'month': month}
+                for location in locations for month in range(1, 13)]
+    cycle = iter(range(1 << 62))
+
+    def post_predict():
+        response = client.post('/api/predict', json=payloads[next(cycle) % len(payloads)])
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    results['handler.model_path'] = measure(post_predict, min_seconds)
+    results['handler.batch[120]'] = measure(
+        lambda: client.post('/api/predict/batch', json={'rows': payloads}), min_seconds)
+
+    # Fallback path: make the registry report no model while it is measured
+    app_module.registry.current = lambda: None
+    try:
+        results['handler.fallback_path'] = measure(post_predict, min_seconds)
+    finally:
+        del app_module.registry.current
+
+    return results
+
+
+def environment_differences(environment, baseline):
+    """Return a list of (field, baseline value, current value) that make timings incomparable"""
+    recorded = baseline.get('environment', {})
+    return [(field, recorded.get(field), environment[field])
+            for field in COMPARABLE_ENVIRONMENT if recorded.get(field) != environment[field]]
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of (name, baseline_us, current_us, ratio) for regressions"""
+    regressions = []
+    for name, summary in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        ratio = summary['mean_us'] / reference['mean_us'] if reference['mean_us'] else float('inf')
+        if ratio > 1 + tolerance:
+            regressions.append((name, reference['mean_us'], summary['mean_us'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prediction pipeline micro-benchmarks')
+    parser.add_argument('--stub', action='store_true', help='use a synthetic model even if models/*.pkl exist')
+    parser.add_argument('--min-seconds', type=float, default=0.3, help='time spent on each benchmark')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to --baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--ignore-environment', action='store_true',
+                        help='compare even if the baseline was recorded in a different environment')
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+    stub = args.stub or not all(os.path.exists(path) for path in ARTIFACTS)
+    if stub:
+        stub_dir = tempfile.mkdtemp(prefix='footfall-bench-')
+        create_stub_artifacts(stub_dir)
+        os.chdir(stub_dir)  # app.py loads models/ relative to the working directory
+
+    # Measure computation, not the result cache or the artifact watcher
+    os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    os.environ['MODEL_WATCH_INTERVAL'] = '0'
+    import logging
+    logging.disable(logging.WARNING)
+    import app as app_module
+
+    if not app_module.registry.wait_until_loaded():
+        sys.exit("Model failed to load; cannot run benchmarks")
+
+    import sklearn
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'stub_model': stub,
+        },
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': run_suite(app_module, args.min_seconds),
+    }
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"{'benchmark':<42} {'mean':>12} {'p50':>12} {'p95':>12}")
+    for name, summary in report['results'].items():
+        print(f"{name:<42} {summary['mean_us']:>9.1f} us {summary['p50_us']:>9.1f} us {summary['p95_us']:>9.1f} us")
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print("No baseline found; run with --save-baseline to create one")
+        return
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    differences = environment_differences(report['environment'], baseline)
+    if differences:
+        print(f"\nBaseline {baseline_path} was recorded in a different environment:")
+        for field, recorded, current in differences:
+            print(f"  {field}: {recorded} (baseline) vs {current} (this run)")
+        if not args.ignore_environment:
+            print("Timings are not comparable; re-record the baseline here with --save-baseline "
+                  "(or pass --ignore-environment)")
+            sys.exit(2)
+
+    regressions = compare(report['results'], baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+        for name, reference, current, ratio in regressions:
+            print(f"  {name}: {reference:.1f} us -> {current:.1f} us ({ratio:.2f}x)")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.tolerance:.0%} against {baseline_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Offline bulk scoring for the Kashmir Tourism Footfall Prediction API
+Scores large CSV or Parquet files of (location, year, month[, rolling_avg]) rows
+with the same feature, scaling, model and post-processing code as backend/app.py
+
+Run from the repository root (model paths are relative to it):
+
+    python backend/bulk_score.py scenarios.csv predictions.csv
+    python backend/bulk_score.py scenarios.parquet predictions.parquet --chunk-rows 50000 --workers 8
+
+The input is read in fixed-size chunks. Chunks are scored by a process pool, with
+the model loaded once per worker, and written to the output in input order as
+they complete. At most two chunks per worker are in flight, so memory stays
+bounded for arbitrarily large inputs. Parquet support requires pyarrow.
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = ['location', 'year', 'month']
+DEFAULT_ROLLING_AVG = 80000
+
+_app = None  # backend/app.py, imported once per worker process
+
+
+def init_worker(verbose=False):
+    """Load the model bundle once in this process"""
+    global _app
+    # One single-threaded model per process; no warm-up or artifact watcher in batch jobs
+    os.environ.setdefault('MODEL_N_JOBS', '1')
+    os.environ.setdefault('MODEL_WARMUP_PASSES', '0')
+    os.environ['MODEL_WATCH_INTERVAL'] = '0'
+    if not verbose:
+        logging.disable(logging.INFO)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+    if not app.registry.wait_until_loaded():
+        raise RuntimeError(f"Model could not be loaded from {os.path.abspath(app.MODEL_PATH)}")
+    _app = app
+
+
+def score_chunk(chunk):
+    """
+    Add a predicted_footfall column to a chunk. Rows that fail input validation
+    are left empty (and counted by the caller) instead of failing the whole job.
+    """
+    bundle = _app.registry.current()
+    if 'rolling_avg' in chunk:
+        rolling_avgs = chunk['rolling_avg'].fillna(DEFAULT_ROLLING_AVG)
+    else:
+        rolling_avgs = pd.Series(DEFAULT_ROLLING_AVG, index=chunk.index)
+
+    locations = chunk['location'].tolist()
+    years = pd.to_numeric(chunk['year'], errors='coerce')
+    months = pd.to_numeric(chunk['month'], errors='coerce')
+    valid = (chunk['location'].isin(list(_app.LOCATION_MAPPING.keys()))
+             & years.notna() & months.between(1, 12)).to_numpy()
+
+    predictions = pd.Series(pd.NA, index=chunk.index, dtype='Int64')
+    if valid.any():
+        values = _app.predict_footfall_values(
+            bundle,
+            [location for location, ok in zip(locations, valid) if ok],
+            years[valid].astype(int).to_numpy(),
+            months[valid].astype(int).to_numpy(),
+            rolling_avgs[valid].astype(float).to_numpy()
+        )
+        predictions[valid] = np.round(np.maximum(0, values)).astype(int)
+
+    result = chunk.copy()
+    result['predicted_footfall'] = predictions
+    return result, int((~valid).sum()), bundle.version
+
+
+def import_parquet():
+    """pyarrow.parquet, or exit with a hint if pyarrow is not installed"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet files require pyarrow (pip install pyarrow)")
+    return pq
+
+
+def read_chunks(path, chunk_rows):
+    """Yield DataFrames of at most chunk_rows rows from a CSV or Parquet file"""
+    if path.endswith('.parquet'):
+        pq = import_parquet()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def count_rows(path):
+    """Total rows if cheaply known (Parquet metadata), else None"""
+    if path.endswith('.parquet'):
+        return import_parquet().ParquetFile(path).metadata.num_rows
+    return None
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._header = True
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            pq = import_parquet()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def report_progress(rows_done, total_rows, started, final=False):
+    elapsed = time.perf_counter() - started
+    rate = rows_done / elapsed if elapsed > 0 else 0.0
+    progress = f"{rows_done:,}/{total_rows:,} rows ({rows_done / total_rows:.0%})" if total_rows else f"{rows_done:,} rows"
+    print(f"{'Done' if final else 'Scored'}: {progress} in {elapsed:.1f}s, {rate:,.0f} rows/s",
+          file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-score CSV/Parquet files of footfall scenarios')
+    parser.add_argument('input', help='CSV or .parquet file with location, year, month[, rolling_avg] columns')
+    parser.add_argument('output', help='CSV or .parquet file to write (input columns + predicted_footfall)')
+    parser.add_argument('--chunk-rows', type=int, default=20000, help='rows per chunk (default: 20000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='scoring processes (default: CPU count; 0 scores in this process)')
+    parser.add_argument('--verbose', action='store_true', help='show the API log output of each worker')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    total_rows = count_rows(args.input)
+    rows_done = 0
+    invalid_rows = 0
+    versions = set()
+
+    if args.workers > 0:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                       initargs=(args.verbose,))
+        max_in_flight = args.workers * 2
+    else:
+        init_worker(args.verbose)
+        executor = None
+
+    writer = ChunkWriter(args.output)
+    pending = deque()
+
+    def write(result):
+        nonlocal rows_done, invalid_rows
+        scored, invalid, version = result
+        writer.write(scored)
+        rows_done += len(scored)
+        invalid_rows += invalid
+        versions.add(version)
+        report_progress(rows_done, total_rows, started)
+
+    def drain(limit):
+        # Results are written in input order; waiting on the oldest chunk bounds memory
+        while len(pending) > limit:
+            write(pending.popleft().result())
+
+    try:
+        for chunk in read_chunks(args.input, args.chunk_rows):
+            missing = [column for column in REQUIRED_COLUMNS if column not in chunk]
+            if missing:
+                sys.exit(f"Input is missing required column(s): {', '.join(missing)}")
+            if executor is None:
+                write(score_chunk(chunk))
+            else:
+                pending.append(executor.submit(score_chunk, chunk))
+                drain(max_in_flight - 1)
+        drain(0)
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    report_progress(rows_done, total_rows, started, final=True)
+    print(f"Model version: {', '.join(sorted(versions)) or 'n/a'}; "
+          f"{invalid_rows:,} invalid row(s) left unscored; output: {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration for production serving of the Kashmir Tourism Footfall Prediction API
+
+Run from the repository root (model paths are relative to it):
+
+    gunicorn -c backend/gunicorn.conf.py
+
+Environment variables:
+    ML_API_BIND      address to bind (default 0.0.0.0:5000)
+    ML_API_WORKERS   number of forked worker processes (default: CPU count)
+    ML_API_THREADS   threads per worker (default 4)
+    ML_API_TIMEOUT   worker timeout in seconds (default 60)
+    MODEL_MMAP_MODE  joblib mmap_mode for model/scaler arrays (default 'r'; empty disables)
+    MODEL_N_JOBS     n_jobs for the loaded model's predict (default 1 - one core per request thread)
+    ML_API_PRELOAD   1 (default) loads the model once in the master before forking;
+                     0 starts workers immediately, each loading the model in the background
+"""
+import multiprocessing
+import os
+
+# Must be set before the app module is imported by preload_app
+os.environ.setdefault('MODEL_MMAP_MODE', 'r')
+os.environ.setdefault('MODEL_N_JOBS', '1')
+
+pythonpath = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'wsgi:application'
+
+bind = os.environ.get('ML_API_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('ML_API_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('ML_API_THREADS', '4'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('ML_API_TIMEOUT', '60'))
+
+# Load the model bundle and feature tables once in the master; workers share them copy-on-write.
+# wsgi.py raises if the model does not load, so gunicorn exits instead of serving fallbacks.
+# Without preloading, workers answer liveness probes at once and report readiness when loaded.
+preload_app = os.environ.get('ML_API_PRELOAD', '1') == '1'
+os.environ.setdefault('MODEL_WAIT_FOR_LOAD', '1' if preload_app else '0')
+
+
+def post_fork(server, worker):
+    """Threads do not survive fork - restart the model artifact watchers in each worker"""
+    if server.cfg.preload_app:
+        from app import candidate_registry, registry
+        registry.start_watcher()
+        if candidate_registry is not None:
+            candidate_registry.start_watcher()
@@ -0,0 +1,169 @@
+"""
+Low-overhead request and stage metrics for the Kashmir Tourism Footfall Prediction API
+Rendered in Prometheus text exposition format at /api/metrics
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+# Latency buckets in seconds (100us .. 2.5s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Metrics:
+    """
+    Counters and histograms kept in per-thread shards.
+
+    Each thread only ever writes its own shard, so recording needs no lock;
+    render() sums the shards of all threads when /api/metrics is scraped.
+    Shards of threads that have exited (e.g. per-request threads of the
+    development server) are folded into one retired shard, so the number of
+    shards stays bounded by the number of live threads.
+    """
+
+    def __init__(self, namespace='footfall', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._descriptions = {}  # name -> (type, help)
+        self._local = threading.local()
+        self._shards = []  # (thread, shard)
+        self._retired = self._new_shard()
+        self._shards_lock = threading.Lock()
+
+    def describe(self, name, metric_type, help_text):
+        self._descriptions[name] = (metric_type, help_text)
+
+    @staticmethod
+    def _new_shard():
+        return {'counters': {}, 'histograms': {}}
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._new_shard()
+            with self._shards_lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+        return shard
+
+    def _retire_dead_shards(self):
+        # Caller holds _shards_lock. A dead thread can no longer write its shard, so folding it is safe.
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                merge_shard(self._retired, shard)
+        self._shards = live
+
+    def inc(self, name, amount=1, **labels):
+        counters = self._shard()['counters']
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        histograms = self._shard()['histograms']
+        key = (name, tuple(sorted(labels.items())))
+        entry = histograms.get(key)
+        if entry is None:
+            # Bucket counts (last one is +Inf), then sum and count
+            entry = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        entry[bisect_left(self.buckets, seconds)] += 1
+        entry[-2] += seconds
+        entry[-1] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def discarding(self):
+        """Record this thread's metrics into a throwaway shard for the block (e.g. model warm-up)"""
+        previous = getattr(self._local, 'shard', None)
+        self._local.shard = self._new_shard()
+        try:
+            yield
+        finally:
+            self._local.shard = previous
+
+    def _merged(self):
+        merged = self._new_shard()
+        with self._shards_lock:
+            self._retire_dead_shards()
+            merge_shard(merged, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            merge_shard(merged, shard)
+        return merged['counters'], merged['histograms']
+
+    def counter_value(self, name, **labels):
+        """Sum of a counter across threads, optionally filtered by labels"""
+        counters, _ = self._merged()
+        wanted = set(labels.items())
+        return sum(value for (metric, key), value in counters.items()
+                   if metric == name and wanted <= set(key))
+
+    def render(self, gauges=()):
+        """
+        Prometheus text format. gauges is an iterable of
+        (name, value, labels_dict) for point-in-time values computed at scrape time.
+        """
+        counters, histograms = self._merged()
+        lines = []
+        described = set()
+
+        def header(name, default_type):
+            if name in described:
+                return
+            described.add(name)
+            metric_type, help_text = self._descriptions.get(name, (default_type, name))
+            lines.append(f"# HELP {self.namespace}_{name} {help_text}")
+            lines.append(f"# TYPE {self.namespace}_{name} {metric_type}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{self.namespace}_{name}{format_labels(labels)} {value}")
+
+        for (name, labels), entry in sorted(histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), entry[:-2]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{self.namespace}_{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{self.namespace}_{name}_sum{format_labels(labels)} {entry[-2]}")
+            lines.append(f"{self.namespace}_{name}_count{format_labels(labels)} {entry[-1]}")
+
+        for name, value, labels in gauges:
+            header(name, 'gauge')
+            lines.append(f"{self.namespace}_{name}{format_labels(tuple(sorted(labels.items())))} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def merge_shard(target, shard):
+    """Add the counters and histograms of shard into target"""
+    counters = target['counters']
+    for key, value in list(shard['counters'].items()):
+        counters[key] = counters.get(key, 0) + value
+    histograms = target['histograms']
+    for key, entry in list(shard['histograms'].items()):
+        merged = histograms.setdefault(key, [0] * len(entry))
+        for i, value in enumerate(entry):
+            merged[i] += value
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
@@ -0,0 +1,155 @@
+"""
+Request micro-batching for the Kashmir Tourism Footfall Prediction API
+Coalesces concurrent single-request inferences into one batched model call
+"""
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the micro-batching queue is full (backpressure)"""
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts per upper bound, plus sum and count)"""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.buckets + [float('inf')], self.counts):
+                running += count
+                cumulative.append((bound, running))
+            return {'buckets': cumulative, 'sum': self.total, 'count': self.count}
+
+
+class MicroBatcher:
+    """
+    Collects inference requests from many threads and runs them together.
+
+    A background thread waits for the first request, then keeps collecting until
+    either max_batch_rows rows are queued or max_wait_ms has passed. It then calls
+    infer(key, rows) once and hands every caller its own slice of the result.
+    Only requests with the same key (e.g. the same model bundle) share a batch.
+    """
+
+    def __init__(self, infer, max_batch_rows=64, max_wait_ms=2.0, max_queue=1024, name='micro-batcher'):
+        self.infer = infer
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._carry = None  # Request with a different key, held for the next batch
+
+        self.batch_rows = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.queue_wait_ms = Histogram([0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100])
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def submit(self, key, rows, timeout=None):
+        """Queue rows for inference and block until their results are ready"""
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put_nowait((key, rows, future, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFullError("Prediction queue is full, try again shortly")
+        return future.result(timeout)
+
+    def _ensure_worker(self):
+        # Started lazily so forked server workers each get their own thread
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        first = self._carry if self._carry is not None else self._queue.get()
+        self._carry = None
+        batch = [first]
+        row_count = len(first[1])
+        deadline = time.perf_counter() + self.max_wait
+
+        while row_count < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item[0] is not first[0]:
+                self._carry = item
+                break
+            batch.append(item)
+            row_count += len(item[1])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            for _, _, _, enqueued in batch:
+                self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+
+            key = batch[0][0]
+            sizes = [len(rows) for _, rows, _, _ in batch]
+            try:
+                results = self.infer(key, np.vstack([rows for _, rows, _, _ in batch]))
+            except Exception as e:
+                logger.error(f"Micro-batch inference failed: {str(e)}")
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            self.batch_rows.observe(sum(sizes))
+            offset = 0
+            for (_, _, future, _), size in zip(batch, sizes):
+                future.set_result(results[offset:offset + size])
+                offset += size
+
+    def stats(self):
+        return {
+            'max_batch_rows': self.max_batch_rows,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'queue_size': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'batches': self.batches,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'batch_rows': self.batch_rows.snapshot(),
+            'queue_wait_ms': self.queue_wait_ms.snapshot()
+        }
@@ -0,0 +1,233 @@
+"""
+Model registry for the Kashmir Tourism Footfall Prediction API
+Holds the model, scaler and metadata as one immutable bundle and hot-reloads
+it when the artifacts on disk change
+"""
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from types import MappingProxyType
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Model, scaler and metadata that were loaded together and are always served together"""
+    model: object
+    scaler: object
+    metadata: MappingProxyType
+    version: str
+    loaded_at: str
+    artifacts: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    @property
+    def target_transform(self):
+        return self.metadata.get('target_transform', 'linear')
+
+    @property
+    def model_type(self):
+        return self.metadata.get('model_type', 'unknown')
+
+
+class ModelRegistry:
+    """
+    Owns the current ModelBundle.
+
+    Request handlers call current() and use the returned bundle for the whole
+    request, so they never see a mix of an old scaler and a new model. A new
+    bundle is fully loaded (and prepared) before it replaces the old one.
+    """
+
+    def __init__(self, model_path, scaler_path, metadata_path, prepare=None, poll_interval=5.0,
+                 mmap_mode=None):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.metadata_path = metadata_path
+        self.prepare = prepare  # Optional callable(bundle) -> dict of derived artifacts
+        self.poll_interval = poll_interval
+        # joblib memory mapping ('r') for numpy arrays in the artifacts. Artifacts must then be
+        # replaced by an atomic rename, never rewritten in place, while the process is running
+        self.mmap_mode = mmap_mode
+
+        self._bundle = None
+        self._fingerprint = None
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_event = threading.Event()
+        self._loader = None
+        self._first_load_done = threading.Event()
+
+        # 'idle' -> 'loading' -> 'ready' or 'failed'; stays 'ready' if a later hot reload fails
+        self._state = 'idle'
+        self._last_error = None
+        self._last_load_seconds = None
+
+    @property
+    def paths(self):
+        return (self.model_path, self.scaler_path, self.metadata_path)
+
+    def current(self):
+        """Return the active bundle (or None if no model is loaded). No disk I/O."""
+        return self._bundle
+
+    @property
+    def state(self):
+        return self._state
+
+    def status(self):
+        """Load state for health/readiness probes. Never triggers a load."""
+        bundle = self._bundle
+        return {
+            'state': self._state,
+            'model_version': bundle.version if bundle is not None else None,
+            'loaded_at': bundle.loaded_at if bundle is not None else None,
+            'last_load_seconds': self._last_load_seconds,
+            'last_error': self._last_error
+        }
+
+    def add_listener(self, callback):
+        """Register callback(bundle) to be called after a new bundle becomes active"""
+        self._listeners.append(callback)
+
+    def fingerprint(self):
+        """Cheap change detector: (path, mtime, size) of every artifact"""
+        stats = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                stats.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stats.append((path, None, None))
+        return tuple(stats)
+
+    def checksum(self):
+        """Content checksum of all artifacts, used as the bundle version"""
+        digest = hashlib.sha256()
+        for path in self.paths:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()[:12]
+
+    def reload(self, force=False):
+        """
+        Load the artifacts into a new bundle and swap it in atomically.
+        Returns True if a bundle is active afterwards.
+        """
+        with self._reload_lock:
+            fingerprint = self.fingerprint()
+            if not force and self._bundle is not None and fingerprint == self._fingerprint:
+                return True
+
+            started = time.perf_counter()
+            if self._bundle is None:
+                self._state = 'loading'
+            try:
+                version = self.checksum()
+                if not force and self._bundle is not None and version == self._bundle.version:
+                    # Files were touched but their contents did not change
+                    self._fingerprint = fingerprint
+                    return True
+
+                model = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
+                scaler = joblib.load(self.scaler_path, mmap_mode=self.mmap_mode)
+                metadata = joblib.load(self.metadata_path)
+
+                # Artifacts changed while we were reading them - try again on the next poll
+                if self.fingerprint() != fingerprint:
+                    logger.warning("Model artifacts changed during load; keeping current bundle")
+                    return self._bundle is not None
+
+                bundle = ModelBundle(
+                    model=model,
+                    scaler=scaler,
+                    metadata=MappingProxyType(dict(metadata)),
+                    version=version,
+                    loaded_at=datetime.now().isoformat()
+                )
+                if self.prepare is not None:
+                    bundle = replace(bundle, artifacts=MappingProxyType(dict(self.prepare(bundle))))
+            except Exception as e:
+                logger.error(f"✗ Failed to load model: {str(e)}")
+                self._last_error = str(e)
+                if self._bundle is None:
+                    self._state = 'failed'
+                self._first_load_done.set()
+                return self._bundle is not None
+
+            # Single reference assignment - readers see either the old or the new bundle
+            self._bundle = bundle
+            self._fingerprint = fingerprint
+            self._state = 'ready'
+            self._last_error = None
+            self._last_load_seconds = round(time.perf_counter() - started, 3)
+            self._first_load_done.set()
+
+        logger.info(f"✓ Model bundle {bundle.version} loaded successfully in {self._last_load_seconds:.2f}s")
+        logger.info(f"  Model type: {bundle.model_type}")
+        logger.info(f"  Features: {getattr(bundle.model, 'n_features_in_', 'unknown')}")
+        logger.info(f"  Target transform: {bundle.target_transform}")
+
+        for callback in self._listeners:
+            try:
+                callback(bundle)
+            except Exception as e:
+                logger.warning(f"Model reload listener failed: {e}")
+        return True
+
+    def load_in_background(self, watch=True):
+        """
+        Start the initial load in a daemon thread and return immediately.
+        With watch=True the artifact watcher starts once it finishes; it also
+        retries a failed initial load every poll_interval seconds.
+        """
+        if self._loader is not None and self._loader.is_alive():
+            return
+        if self._bundle is None:
+            self._state = 'loading'
+
+        def load():
+            self.reload(force=True)
+            if watch:
+                self.start_watcher()
+
+        self._loader = threading.Thread(target=load, name='model-registry-loader', daemon=True)
+        self._loader.start()
+
+    def wait_until_loaded(self, timeout=None):
+        """Block until the first load attempt has finished; True if a bundle is active"""
+        loader = self._loader
+        if loader is not None:
+            # Joining (not just waiting for the event) also covers listeners and the watcher start
+            loader.join(timeout)
+        else:
+            self._first_load_done.wait(timeout)
+        return self._bundle is not None
+
+    def start_watcher(self):
+        """Poll the artifacts in a daemon thread and reload when they change"""
+        if self.poll_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self, timeout=5.0):
+        """Stop the watcher thread and wait for any reload it is running to finish"""
+        self._stop_event.set()
+        if self._watcher is not None and self._watcher.is_alive():
+            self._watcher.join(timeout)
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            if self.fingerprint() != self._fingerprint:
+                logger.info("Model artifacts changed on disk, reloading")
+                self.reload()
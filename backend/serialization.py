@@ -0,0 +1,52 @@
+"""
+Fast JSON serialization for the Kashmir Tourism Footfall Prediction API
+Uses orjson when it is installed, with a compact stdlib json fallback, and
+lets responses splice in pre-rendered JSON fragments without re-encoding them
+"""
+import json
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _default(value):
+    # NumPy scalars and arrays, which the stdlib encoder rejects
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(obj):
+        """Serialize obj to compact JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+else:
+    def dumps(obj):
+        """Serialize obj to compact JSON bytes"""
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def splice(object_json, fragments):
+    """
+    Add pre-rendered members to a rendered JSON object.
+    object_json is the bytes of a JSON object; fragments maps member name -> JSON bytes.
+    """
+    members = b','.join(dumps(name) + b':' + fragment for name, fragment in fragments.items())
+    if not members:
+        return object_json
+    if object_json == b'{}':
+        return b'{' + members + b'}'
+    return object_json[:-1] + b',' + members + b'}'
+
+
+def json_response(body, status=200, headers=None):
+    """Response with a JSON body; body is either JSON bytes or an object to serialize"""
+    if not isinstance(body, (bytes, bytearray)):
+        body = dumps(body)
+    return Response(body, status=status, headers=headers, mimetype='application/json')
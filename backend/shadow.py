@@ -0,0 +1,166 @@
+"""
+Shadow scoring for the Kashmir Tourism Footfall Prediction API
+Scores a second (candidate) model off the request path and records how its
+predictions differ from the primary model's
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from micro_batching import Histogram
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = [0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000]
+
+
+class ShadowScorer:
+    """
+    Runs score(bundle, rows, scaled_features) for the model that did not serve a
+    request in a bounded thread pool, then appends one JSON line per row with both
+    predictions to log_path and updates running error/latency statistics.
+
+    submit() never blocks the request: at most max_pending jobs are queued or
+    running, and jobs beyond that are dropped (and counted).
+    """
+
+    def __init__(self, score, log_path, workers=1, max_pending=256, name='shadow'):
+        self.score = score
+        self.log_path = log_path
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._log = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rows = 0
+        self._delta_sum = 0.0
+        self._abs_delta_sum = 0.0
+        self._abs_pct_sum = 0.0
+        self._pct_rows = 0
+        self._max_abs_delta = 0
+        self.latency_ms = {
+            'primary': Histogram(LATENCY_BUCKETS_MS),
+            'candidate': Histogram(LATENCY_BUCKETS_MS)
+        }
+
+    def submit(self, endpoint, served, served_variant, other, rows, served_values, served_ms=None,
+               scaled_features=None):
+        """
+        Queue scoring of rows (locations, years, months, rolling_avgs) with the other
+        bundle. served_values are the predictions already returned by the served bundle.
+        Returns False if the job was dropped because the pool is saturated.
+        """
+        if not self._slots.acquire(blocking=False):
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        if served_ms is not None:
+            self.latency_ms[served_variant].observe(served_ms)
+        try:
+            self._executor.submit(self._run, endpoint, served, served_variant, other, rows,
+                                  np.asarray(served_values), scaled_features)
+        except RuntimeError:
+            # Executor shut down (interpreter exit)
+            self._slots.release()
+            return False
+        return True
+
+    def _run(self, endpoint, served, served_variant, other, rows, served_values, scaled_features):
+        try:
+            started = time.perf_counter()
+            other_values = np.asarray(self.score(other, rows, scaled_features))
+            other_ms = (time.perf_counter() - started) * 1000
+            other_variant = 'candidate' if served_variant == 'primary' else 'primary'
+            self.latency_ms[other_variant].observe(other_ms)
+
+            if served_variant == 'primary':
+                primary, candidate, primary_bundle, candidate_bundle = served_values, other_values, served, other
+            else:
+                primary, candidate, primary_bundle, candidate_bundle = other_values, served_values, other, served
+            self._record(endpoint, served_variant, primary_bundle, candidate_bundle, rows, primary, candidate,
+                         other_ms)
+            self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Shadow scoring failed: {str(e)}")
+        finally:
+            self._slots.release()
+
+    def _record(self, endpoint, served_variant, primary_bundle, candidate_bundle, rows, primary, candidate,
+                shadow_ms):
+        delta = candidate - primary
+        nonzero = primary != 0
+        timestamp = datetime.now().isoformat()
+        lines = b''.join(
+            dumps({
+                'timestamp': timestamp,
+                'endpoint': endpoint,
+                'served': served_variant,
+                'primary_version': primary_bundle.version,
+                'candidate_version': candidate_bundle.version,
+                'location': location,
+                'year': year,
+                'month': month,
+                'rolling_avg': rolling_avg,
+                'primary': primary_value,
+                'candidate': candidate_value,
+                'delta': delta_value,
+                'shadow_ms': round(shadow_ms, 3)
+            }) + b'\n'
+            for location, year, month, rolling_avg, primary_value, candidate_value, delta_value
+            in zip(*rows, primary.tolist(), candidate.tolist(), delta.tolist())
+        )
+
+        with self._lock:
+            if self._log is None:
+                directory = os.path.dirname(self.log_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._log = open(self.log_path, 'ab')
+            self._log.write(lines)
+            self._log.flush()
+
+            self.rows += len(delta)
+            self._delta_sum += float(delta.sum())
+            self._abs_delta_sum += float(np.abs(delta).sum())
+            self._abs_pct_sum += float((np.abs(delta[nonzero]) / np.abs(primary[nonzero].astype(float))).sum())
+            self._pct_rows += int(nonzero.sum())
+            if len(delta):
+                self._max_abs_delta = max(self._max_abs_delta, float(np.abs(delta).max()))
+
+    def stats(self):
+        with self._lock:
+            rows = self.rows
+            deltas = {
+                'rows': rows,
+                'mean_delta': self._delta_sum / rows if rows else None,
+                'mean_abs_delta': self._abs_delta_sum / rows if rows else None,
+                'mean_abs_pct': self._abs_pct_sum / self._pct_rows * 100 if self._pct_rows else None,
+                'max_abs_delta': self._max_abs_delta if rows else None
+            }
+        latency = {}
+        for variant, histogram in self.latency_ms.items():
+            snapshot = histogram.snapshot()
+            snapshot['mean'] = snapshot['sum'] / snapshot['count'] if snapshot['count'] else None
+            latency[variant] = snapshot
+        return {
+            'log_path': os.path.abspath(self.log_path),
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'deltas': deltas,
+            'latency_ms': latency
+        }
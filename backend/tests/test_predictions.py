@@ -0,0 +1,97 @@
+"""
+Consistency checks for the model prediction paths in backend/app.py
+
+Run from the repository root (needs the trained artifacts under models/):
+
+    python -m pytest backend/tests -q
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+LOCATIONS = ['Gulmarg', 'Pahalgam', 'Gurez']
+MONTHS = [1, 2, 6, 12]
+
+
+@pytest.fixture(scope='module')
+def app_module():
+    # app.py loads models/ relative to the working directory; no watcher or warm-up in tests
+    os.chdir(REPO_ROOT)
+    os.environ['MODEL_WATCH_INTERVAL'] = '0'
+    os.environ['MODEL_WARMUP_PASSES'] = '0'
+    import app as app_module
+
+    if not app_module.registry.wait_until_loaded(timeout=300):
+        pytest.skip('Trained model artifacts are not available')
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    app_module.prediction_cache.clear()
+    return app_module.app.test_client()
+
+
+def predict(client, **body):
+    response = client.post('/api/predict', json=body)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()['prediction']
+
+
+def test_flat_engine_matches_model_predict(app_module):
+    from tree_engine import FlatTreeEnsemble, UnsupportedModelError
+
+    bundle = app_module.registry.current()
+    try:
+        engine = FlatTreeEnsemble.from_model(bundle.model)
+    except UnsupportedModelError:
+        pytest.skip(f'{type(bundle.model).__name__} cannot be exported to the flat engine')
+
+    rows = [(location, year, month) for location in app_module.LOCATION_MAPPING
+            for year in (2020, 2025, 2030) for month in range(1, 13)]
+    locations, years, months = (list(column) for column in zip(*rows))
+    scaled = app_module.scale_features_batch(bundle, locations, years, months, [80000] * len(rows))
+    noise = np.random.default_rng(0).standard_normal((500, app_module.NUM_FEATURES))
+
+    for features in (scaled, noise):
+        np.testing.assert_allclose(engine.predict(features), bundle.model.predict(features), rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize('intervals', [False, True])
+def test_batch_matches_single_predictions(client, intervals):
+    rows = [{'location': location, 'year': 2025, 'month': month, 'rolling_avg': 60000 + 1000 * month}
+            for location in LOCATIONS for month in MONTHS]
+    response = client.post('/api/predict/batch', json={'rows': rows, 'intervals': intervals})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    batch = response.get_json()['predictions']
+
+    for row, result in zip(rows, batch):
+        single = predict(client, intervals=intervals, **row)
+        assert result['predicted_footfall'] == single['predicted_footfall']
+        assert result['resourceRequirements'] == single['resourceRequirements']
+        if intervals:
+            assert result['prediction_interval'] == single['prediction_interval']
+
+
+def test_cached_responses_match_fresh_ones(app_module, client):
+    body = {'location': 'Gulmarg', 'year': 2025, 'month': 2, 'rolling_avg': 50000, 'intervals': True}
+    fresh = predict(client, **body)
+    hits = app_module.metrics.counter_value('prediction_cache_lookups_total', result='hit')
+    cached = predict(client, **body)
+    assert app_module.metrics.counter_value('prediction_cache_lookups_total', result='hit') == hits + 1
+    assert cached == fresh
+
+    # Equal inputs sent with other JSON number types share the cache entry and render identically
+    assert predict(client, **{**body, 'year': 2025.0, 'month': 2.0, 'rolling_avg': 50000.0}) == fresh
+    app_module.prediction_cache.clear()
+    assert predict(client, **{**body, 'rolling_avg': 50000.0}) == fresh
+
+    response = client.get('/api/predict?location=Gulmarg&year=2025&month=2&rolling_avg=50000.0&intervals=1')
+    assert response.status_code == 200
+    assert response.get_json()['prediction'] == fresh
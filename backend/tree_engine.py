@@ -0,0 +1,197 @@
+"""
+Compact array-backed tree ensemble inference for the Kashmir Tourism Footfall Prediction API
+
+Exports the trees of a fitted model to flat NumPy arrays at load time and
+evaluates all trees for all rows with a vectorized, level-by-level traversal.
+For one or a few rows this skips most of the per-call validation and
+dispatch overhead of the scikit-learn/XGBoost Python wrappers.
+
+Supported models:
+    scikit-learn DecisionTreeRegressor, RandomForestRegressor, ExtraTreesRegressor
+    XGBoost XGBRegressor (gbtree booster)
+"""
+import json
+
+import numpy as np
+
+
+class UnsupportedModelError(TypeError):
+    """Raised when a model cannot be exported to a FlatTreeEnsemble"""
+
+
+class FlatTreeEnsemble:
+    """
+    All nodes of all trees in flat arrays. Leaves point to themselves, so a fixed
+    number of traversal steps (the maximum depth) lands every row on a leaf.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 aggregate='mean', base_score=0.0, strict_less=False, dtype=np.float32):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # Interleaved [left, right] children so one gather picks the next node
+        self.children = np.empty(2 * len(feature), dtype=np.intp)
+        self.children[0::2] = left
+        self.children[1::2] = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.aggregate = aggregate  # 'mean' (random forest) or 'sum' (boosting)
+        self.base_score = base_score
+        self.strict_less = strict_less  # XGBoost goes left on x < threshold, scikit-learn on x <= threshold
+        self.dtype = dtype
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_model(cls, model):
+        """Export a fitted model, raising UnsupportedModelError for anything else"""
+        if hasattr(model, 'get_booster'):
+            return cls._from_xgboost(model)
+        if hasattr(model, 'tree_'):
+            return cls._from_sklearn_trees([model], aggregate='mean')
+        estimators = getattr(model, 'estimators_', None)
+        if (isinstance(estimators, list) and estimators and all(hasattr(e, 'tree_') for e in estimators)
+                and type(model).__name__ in ('RandomForestRegressor', 'ExtraTreesRegressor')):
+            return cls._from_sklearn_trees(estimators, aggregate='mean')
+        raise UnsupportedModelError(f"Cannot export {type(model).__name__} to flat trees")
+
+    @classmethod
+    def _from_sklearn_trees(cls, estimators, aggregate):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            if tree.n_outputs != 1:
+                raise UnsupportedModelError("Only single-output trees are supported")
+            count = tree.node_count
+            is_leaf = tree.children_left == -1
+            own_index = np.arange(count) + offset
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += count
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            aggregate=aggregate
+        )
+
+    @classmethod
+    def _from_xgboost(cls, model):
+        booster = model.get_booster()
+        config = json.loads(booster.save_config())
+        if config['learner']['gradient_booster']['name'] != 'gbtree':
+            raise UnsupportedModelError("Only gbtree XGBoost boosters are supported")
+        # Newer XGBoost versions store base_score as a vector literal, e.g. '[5E-1]'
+        base_score = float(str(config['learner']['learner_model_param']['base_score']).strip('[]').split(',')[0])
+        feature_names = booster.feature_names
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        max_depth = 0
+        for dump in booster.get_dump(dump_format='json'):
+            root = len(features)
+            roots.append(root)
+            # Assign flat indices in traversal order; XGBoost node ids are per tree
+            pending = [(json.loads(dump), 0)]
+            index_of = {}
+            nodes = []
+            while pending:
+                node, depth = pending.pop()
+                index_of[node['nodeid']] = root + len(nodes)
+                nodes.append(node)
+                max_depth = max(max_depth, depth)
+                for child in node.get('children', []):
+                    pending.append((child, depth + 1))
+            for node in nodes:
+                own_index = index_of[node['nodeid']]
+                if 'leaf' in node:
+                    features.append(0)
+                    thresholds.append(np.inf)
+                    lefts.append(own_index)
+                    rights.append(own_index)
+                    values.append(node['leaf'])
+                else:
+                    split = node['split']
+                    if feature_names is not None and split in feature_names:
+                        features.append(feature_names.index(split))
+                    else:
+                        features.append(int(str(split).lstrip('f')))
+                    thresholds.append(node['split_condition'])
+                    lefts.append(index_of[node['yes']])
+                    rights.append(index_of[node['no']])
+                    values.append(0.0)
+
+        return cls(
+            feature=np.asarray(features, dtype=np.intp),
+            threshold=np.asarray(thresholds, dtype=np.float32),
+            left=np.asarray(lefts, dtype=np.intp),
+            right=np.asarray(rights, dtype=np.intp),
+            value=np.asarray(values, dtype=np.float32),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            aggregate='sum',
+            base_score=base_score,
+            strict_less=True
+        )
+
+    def leaf_values(self, X):
+        """N x n_trees matrix of each tree's output for each row"""
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = flat_X[row_offsets + self.feature[nodes]]
+            if self.strict_less:
+                go_right = x >= self.threshold[nodes]
+            else:
+                go_right = x > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+        return self.value[nodes]
+
+    def predict(self, X):
+        leaves = self.leaf_values(X)
+        if self.aggregate == 'mean':
+            return leaves.mean(axis=1)
+        return leaves.sum(axis=1, dtype=np.float64) + self.base_score
+
+    def max_abs_difference(self, model, X):
+        """Largest absolute difference from model.predict on X"""
+        return float(np.max(np.abs(self.predict(X) - model.predict(X))))
+
+
+def export_model(model, check_rows, tolerance=1e-6):
+    """
+    Export model to a FlatTreeEnsemble and verify it against model.predict on check_rows.
+    Returns (engine, max_abs_difference); engine is None if export or verification failed.
+    """
+    try:
+        engine = FlatTreeEnsemble.from_model(model)
+    except UnsupportedModelError:
+        return None, None
+    difference = engine.max_abs_difference(model, check_rows)
+    if not difference <= tolerance:
+        return None, difference
+    return engine, difference
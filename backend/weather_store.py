@@ -0,0 +1,223 @@
+"""
+Year-aware weather feature store for the Kashmir Tourism Footfall Prediction API
+Observed or forecast monthly weather per (location, year, month), stored as one
+.npy array per weather column and memory-mapped at startup
+
+Build it from CSV files (run from the repository root):
+
+    python backend/weather_store.py ingest data/interim/monthly_weather_data
+    python backend/weather_store.py ingest data/interim/daily_weather_data/*.csv --sunshine-unit seconds
+    python backend/weather_store.py info
+
+CSV files need a location column (names as in the API), either year and month
+columns or a date column, and any of the weather columns below (or their short
+WEATHER_DATA names: temp_mean, temp_max, temp_min, precip, sunshine). Values use
+the units of the model features: degrees C, mm per month and sunshine hours per
+month. Daily rows are aggregated to months (temperatures averaged, precipitation
+and sunshine summed). Cells without data are NaN and fall back to climatology.
+"""
+import argparse
+from datetime import datetime
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+DEFAULT_STORE_PATH = os.path.join('data', 'weather_store')
+STORE_FORMAT = 1
+
+# Weather inputs of the model, in feature order; interaction terms are derived from them
+WEATHER_COLUMNS = ['temperature_2m_mean', 'temperature_2m_max', 'temperature_2m_min',
+                   'precipitation_sum', 'sunshine_duration']
+COLUMN_ALIASES = {'temp_mean': 'temperature_2m_mean', 'temp_max': 'temperature_2m_max',
+                  'temp_min': 'temperature_2m_min', 'precip': 'precipitation_sum',
+                  'sunshine': 'sunshine_duration'}
+SUMMED_COLUMNS = ('precipitation_sum', 'sunshine_duration')  # Monthly totals; temperatures are averages
+
+
+class WeatherStore:
+    """
+    Monthly weather arrays of shape [location, year - year_min, month] (month 0 unused),
+    one per column, memory-mapped read-only so opening is O(1) in the amount of data
+    and lookups only touch the pages they gather from.
+    """
+
+    def __init__(self, path, locations, year_min, year_max, arrays, version):
+        self.path = path
+        self.locations = list(locations)
+        self.location_index = {location: index for index, location in enumerate(self.locations)}
+        self.year_min = year_min
+        self.year_max = year_max
+        self.arrays = arrays
+        self.columns = list(arrays)
+        self.version = version
+
+    @classmethod
+    def open(cls, path):
+        """Map an ingested store; raises OSError/ValueError if it is missing or malformed"""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('format') != STORE_FORMAT:
+            raise ValueError(f"Unsupported weather store format: {meta.get('format')}")
+        expected_shape = (len(meta['locations']), meta['year_max'] - meta['year_min'] + 1, 13)
+        arrays = {}
+        for column in meta['columns']:
+            array = np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+            if array.shape != expected_shape:
+                raise ValueError(f"{column}.npy has shape {array.shape}, expected {expected_shape}")
+            arrays[column] = array
+        return cls(path, meta['locations'], meta['year_min'], meta['year_max'], arrays, meta['version'])
+
+    def rows_for(self, locations):
+        """Store row of each location name (-1 if the store has no data for it)"""
+        return np.array([self.location_index.get(location, -1) for location in locations], dtype=np.intp)
+
+    def lookup(self, rows, years, months):
+        """
+        N x len(WEATHER_COLUMNS) weather for each (store row, year, month) in one gather per
+        column; NaN wherever the store has no value (unknown location or year, missing cell)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        year_index = np.asarray(years, dtype=np.intp) - self.year_min
+        months = np.asarray(months, dtype=np.intp)
+        result = np.full((len(rows), len(WEATHER_COLUMNS)), np.nan)
+        inside = (rows >= 0) & (year_index >= 0) & (year_index <= self.year_max - self.year_min)
+        if inside.any():
+            rows, year_index, months = rows[inside], year_index[inside], months[inside]
+            for index, column in enumerate(WEATHER_COLUMNS):
+                array = self.arrays.get(column)
+                if array is not None:
+                    result[inside, index] = array[rows, year_index, months]
+        return result
+
+    def info(self):
+        return {
+            'path': os.path.abspath(self.path),
+            'version': self.version,
+            'locations': self.locations,
+            'year_min': self.year_min,
+            'year_max': self.year_max,
+            'columns': self.columns
+        }
+
+
+def read_monthly_weather(paths, sunshine_unit='hours'):
+    """Read weather CSVs into one DataFrame with location, year, month and weather columns per month"""
+    import pandas as pd
+
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path).rename(columns=COLUMN_ALIASES)
+        if 'location' not in frame:
+            sys.exit(f"{path}: missing location column")
+        if 'year' not in frame or 'month' not in frame:
+            date_column = next((column for column in ('date', 'time') if column in frame), None)
+            if date_column is None:
+                sys.exit(f"{path}: needs year and month columns or a date column")
+            dates = pd.to_datetime(frame[date_column])
+            frame['year'] = dates.dt.year
+            frame['month'] = dates.dt.month
+        columns = [column for column in WEATHER_COLUMNS if column in frame]
+        if not columns:
+            sys.exit(f"{path}: no weather columns (expected any of {', '.join(WEATHER_COLUMNS)})")
+        frames.append(frame[['location', 'year', 'month'] + columns])
+
+    data = pd.concat(frames, ignore_index=True)
+    data = data[data['month'].between(1, 12)]
+    if sunshine_unit == 'seconds' and 'sunshine_duration' in data:
+        data['sunshine_duration'] = data['sunshine_duration'] / 3600
+    aggregations = {column: ('sum' if column in SUMMED_COLUMNS else 'mean')
+                    for column in WEATHER_COLUMNS if column in data}
+    # min_count keeps all-missing sums as NaN (climatology) instead of 0
+    monthly = data.groupby(['location', 'year', 'month']).agg(
+        {column: (lambda values: values.sum(min_count=1)) if how == 'sum' else how
+         for column, how in aggregations.items()})
+    return monthly.reset_index()
+
+
+def build_store(monthly, output, sources=()):
+    """Write monthly weather (from read_monthly_weather) as a store directory, replacing output atomically"""
+    locations = sorted(monthly['location'].unique())
+    year_min, year_max = int(monthly['year'].min()), int(monthly['year'].max())
+    shape = (len(locations), year_max - year_min + 1, 13)
+    rows = monthly['location'].map({location: index for index, location in enumerate(locations)}).to_numpy()
+    year_index = monthly['year'].to_numpy(dtype=np.intp) - year_min
+    months = monthly['month'].to_numpy(dtype=np.intp)
+
+    staging = output.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    digest = hashlib.sha256(json.dumps([locations, year_min, year_max]).encode('utf-8'))
+    columns = [column for column in WEATHER_COLUMNS if column in monthly]
+    for column in columns:
+        array = np.full(shape, np.nan)
+        array[rows, year_index, months] = monthly[column].to_numpy(dtype=float)
+        np.save(os.path.join(staging, f"{column}.npy"), array)
+        digest.update(column.encode('utf-8') + array.tobytes())
+
+    meta = {
+        'format': STORE_FORMAT,
+        'version': digest.hexdigest()[:12],
+        'locations': locations,
+        'year_min': year_min,
+        'year_max': year_max,
+        'columns': columns,
+        'cells': int(len(monthly)),
+        'sources': [os.path.basename(source) for source in sources],
+        'created_at': datetime.now().isoformat()
+    }
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap directories by renaming, so output is never a half-deleted store; the old one is only
+    # removed once the new one is in place (running servers keep their mapping of its files)
+    previous = output.rstrip(os.sep) + '.old'
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(output):
+        os.replace(output, previous)
+    os.replace(staging, output)
+    shutil.rmtree(previous, ignore_errors=True)
+    return meta
+
+
+def expand_sources(sources):
+    """CSV paths from file, directory and glob arguments"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, '*.csv'))))
+        else:
+            paths.extend(sorted(glob.glob(source)) or [source])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or inspect the year-aware weather feature store')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='build the store from monthly or daily weather CSVs')
+    ingest.add_argument('sources', nargs='+', help='CSV files, directories of CSVs or glob patterns')
+    ingest.add_argument('--output', default=DEFAULT_STORE_PATH, help=f'store directory (default: {DEFAULT_STORE_PATH})')
+    ingest.add_argument('--sunshine-unit', choices=('hours', 'seconds'), default='hours',
+                        help='unit of sunshine_duration in the CSVs (default: hours)')
+    info = commands.add_parser('info', help='describe an existing store')
+    info.add_argument('--path', default=DEFAULT_STORE_PATH, help=f'store directory (default: {DEFAULT_STORE_PATH})')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        print(json.dumps(WeatherStore.open(args.path).info(), indent=2))
+        return
+
+    paths = expand_sources(args.sources)
+    if not paths:
+        sys.exit("No CSV files found")
+    meta = build_store(read_monthly_weather(paths, args.sunshine_unit), args.output, sources=paths)
+    print(f"Weather store {meta['version']}: {meta['cells']:,} location-months, {len(meta['locations'])} locations, "
+          f"{meta['year_min']}-{meta['year_max']}, columns {', '.join(meta['columns'])} -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
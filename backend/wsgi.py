@@ -0,0 +1,45 @@
+"""
+WSGI entry point for production serving of the Kashmir Tourism Footfall Prediction API
+
+Used by gunicorn.conf.py. With preload_app (the default) this module is imported
+in the gunicorn master: it waits for the background model load so the bundle is
+shared copy-on-write with the forked workers, and unlike the development server,
+startup fails if the model cannot be loaded. A configured candidate model
+(CANDIDATE_MODEL_PATH) is waited for too, but failing to load it only logs a warning.
+
+With MODEL_WAIT_FOR_LOAD=0 (set by gunicorn.conf.py when ML_API_PRELOAD=0) each
+worker starts serving immediately and loads the model in the background;
+/api/health/ready returns 503 until it is loaded.
+"""
+import logging
+import os
+
+from app import app, candidate_registry, registry
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the initial model load before giving up
+MODEL_LOAD_TIMEOUT = float(os.environ.get('MODEL_LOAD_TIMEOUT', '300'))
+
+if os.environ.get('MODEL_WAIT_FOR_LOAD', '1') == '1':
+    if not registry.wait_until_loaded(MODEL_LOAD_TIMEOUT):
+        raise RuntimeError(
+            f"Model failed to load from {registry.model_path} ({registry.state}); refusing to start production server"
+        )
+
+    # A fork during a reload would leave workers with a held reload lock and no loader thread
+    if candidate_registry is not None and not candidate_registry.wait_until_loaded(MODEL_LOAD_TIMEOUT):
+        if candidate_registry.state == 'loading':
+            raise RuntimeError(
+                f"Candidate model {candidate_registry.model_path} still loading after {MODEL_LOAD_TIMEOUT:.0f}s; "
+                "refusing to fork workers"
+            )
+        logger.warning(f"Candidate model failed to load from {candidate_registry.model_path} "
+                       f"({candidate_registry.state}); serving the primary model only")
+
+    # The master only forks workers; each worker starts its own watchers after fork
+    registry.stop_watcher()
+    if candidate_registry is not None:
+        candidate_registry.stop_watcher()
+
+application = app
@@ -134,8 +134,7 @@ app.get('/api/health', async (req, res) => {
 // Public endpoints - No authentication required
 app.get('/api/public/locations', async (req, res) => {
     try {
-        const mlResponse = await axios.get(`${ML_API_URL}/api/locations`);
-        res.json(mlResponse.data);
+        await sendLocations(res);
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
@@ -598,20 +597,63 @@ app.get('/api/predictions/range', async (req, res) => {
     }
 });
 
+// Conditional GET cache for ML service responses: revalidate with If-None-Match and reuse
+// the cached payload on 304 Not Modified (the ML service sends ETags for predictions and
+// the locations catalog)
+const ML_CACHE_MAX_ENTRIES = 1000;
+const mlResponseCache = new Map(); // url -> { etag, data }, in least-recently-used order
+
+async function conditionalGet(url) {
+    const cached = mlResponseCache.get(url);
+
+    const mlResponse = await axios.get(url, {
+        headers: cached ? { 'If-None-Match': cached.etag } : {},
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 304
+    });
+
+    const data = mlResponse.status === 304 && cached ? cached.data : mlResponse.data;
+    const etag = mlResponse.headers.etag;
+    mlResponseCache.delete(url);
+    if (etag) {
+        mlResponseCache.set(url, { etag, data });
+        if (mlResponseCache.size > ML_CACHE_MAX_ENTRIES) {
+            mlResponseCache.delete(mlResponseCache.keys().next().value);
+        }
+    }
+    return { data, cacheControl: mlResponse.headers['cache-control'] };
+}
+
+async function fetchPrediction({ location, year, month, rolling_avg }) {
+    const query = new URLSearchParams({
+        location,
+        year,
+        month,
+        rolling_avg: rolling_avg || 80000
+    }).toString();
+    const { data } = await conditionalGet(`${ML_API_URL}/api/predict?${query}`);
+
+    // The GET variant has no per-request timestamp; keep the POST response shape for clients
+    return { ...data, timestamp: new Date().toISOString() };
+}
+
+async function sendLocations(res) {
+    const { data, cacheControl } = await conditionalGet(`${ML_API_URL}/api/locations`);
+    if (cacheControl) {
+        res.set('Cache-Control', cacheControl);
+    }
+    // Express adds an ETag and answers browser revalidations with 304
+    res.json(data);
+}
+
 // Make prediction
 app.post('/api/predict', async (req, res) => {
     try {
         const { location, year, month, rolling_avg } = req.body;
 
-        // Call Python ML service
-        const mlResponse = await axios.post(`${ML_API_URL}/api/predict`, {
-            location,
-            year,
-            month,
-            rolling_avg: rolling_avg || 80000
-        });
+        // Call Python ML service (conditional GET - unchanged predictions come back as 304)
+        const mlData = await fetchPrediction({ location, year, month, rolling_avg });
 
-        const predictionData = mlResponse.data.prediction;
+        const predictionData = mlData.prediction;
 
         // Save to database only if MongoDB is connected
         if (mongoConnected) {
@@ -619,7 +661,7 @@ app.post('/api/predict', async (req, res) => {
             await prediction.save();
         }
 
-        res.json(mlResponse.data);
+        res.json(mlData);
     } catch (error) {
         console.error('Prediction error:', error);
         res.status(500).json({ 
@@ -631,8 +673,7 @@ app.post('/api/predict', async (req, res) => {
 // Get locations
 app.get('/api/locations', async (req, res) => {
     try {
-        const mlResponse = await axios.get(`${ML_API_URL}/api/locations`);
-        res.json(mlResponse.data);
+        await sendLocations(res);
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
@@ -683,6 +724,18 @@ app.post('/api/resources', async (req, res) => {
     }
 });
 
+// Season-wide resource plan (all locations x months in one ML service call)
+app.post('/api/resources/plan', async (req, res) => {
+    try {
+        const response = await axios.post(`${ML_API_URL}/api/resources/plan`, req.body);
+        res.json(response.data);
+    } catch (error) {
+        res.status(error.response?.status || 500).json({
+            error: error.response?.data?.error || error.message
+        });
+    }
+});
+
 // Admin protected endpoints
 app.get('/api/admin/predictions', verifyToken, requireAdmin, async (req, res) => {
     try {
@@ -745,15 +798,10 @@ app.post('/api/admin/prediction-create', verifyToken, requireAdmin, async (req,
     try {
         const { location, year, month, rolling_avg } = req.body;
 
-        // Call Python ML service
-        const mlResponse = await axios.post(`${ML_API_URL}/api/predict`, {
-            location,
-            year,
-            month,
-            rolling_avg: rolling_avg || 80000
-        });
+        // Call Python ML service (conditional GET - unchanged predictions come back as 304)
+        const mlData = await fetchPrediction({ location, year, month, rolling_avg });
 
-        const predictionData = mlResponse.data.prediction;
+        const predictionData = mlData.prediction;
 
         // Save to database only if MongoDB is connected
         if (mongoConnected) {
@@ -761,7 +809,7 @@ app.post('/api/admin/prediction-create', verifyToken, requireAdmin, async (req,
             await prediction.save();
         }
 
-        res.json(mlResponse.data);
+        res.json(mlData);
     } catch (error) {
         console.error('Prediction error:', error);
         res.status(500).json({ 